@@ -6,10 +6,11 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import asyncio
-import asyncpg
+import time
 import redis.asyncio as redis
+from sqlalchemy import text
 from datetime import datetime
 
 from app.core.config import settings
@@ -34,14 +35,43 @@ class ServiceStatus(BaseModel):
     details: Dict[str, Any] = {}
 
 
+# 健康检查共用的Redis客户端 (内部维护连接池)
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis_client() -> redis.Redis:
+    """获取共享的Redis客户端"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+async def close_redis_client():
+    """关闭共享的Redis客户端"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.close()
+        _redis_client = None
+
+
+# Firecrawl状态缓存: (检查时间, 状态)，只缓存健康结果
+FIRECRAWL_STATUS_TTL_SECONDS = 60.0
+_firecrawl_status_cache: Optional[Tuple[float, ServiceStatus]] = None
+# 进行中的Firecrawl探测，并发的检查共享同一次请求
+_firecrawl_probe: Optional[asyncio.Future] = None
+
+
 async def check_database() -> ServiceStatus:
     """检查数据库连接状态"""
     start_time = asyncio.get_event_loop().time()
     
     try:
-        conn = await asyncpg.connect(str(settings.DATABASE_URL))
-        await conn.execute("SELECT 1")
-        await conn.close()
+        # 复用应用的连接池，不再每次检查都新建连接
+        from app.database.base import engine
+        
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         
         response_time = (asyncio.get_event_loop().time() - start_time) * 1000
         
@@ -65,9 +95,7 @@ async def check_redis() -> ServiceStatus:
     start_time = asyncio.get_event_loop().time()
     
     try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-        await redis_client.ping()
-        await redis_client.close()
+        await get_redis_client().ping()
         
         response_time = (asyncio.get_event_loop().time() - start_time) * 1000
         
@@ -87,8 +115,35 @@ async def check_redis() -> ServiceStatus:
 
 
 async def check_firecrawl() -> ServiceStatus:
-    """检查Firecrawl API状态"""
-    import httpx
+    """检查Firecrawl API状态
+
+    健康的探测结果在短时间内复用，监控频繁轮询时不会每次都发起远程请求；
+    失败结果不缓存，下次检查立即重新探测。缓存未命中时并发的检查共享同一次探测
+    """
+    global _firecrawl_status_cache, _firecrawl_probe
+    if _firecrawl_status_cache is not None:
+        checked_at, status = _firecrawl_status_cache
+        if time.monotonic() - checked_at < FIRECRAWL_STATUS_TTL_SECONDS:
+            return status
+    
+    if _firecrawl_probe is None:
+        _firecrawl_probe = asyncio.ensure_future(_probe_firecrawl())
+        _firecrawl_probe.add_done_callback(_on_firecrawl_probe_done)
+    return await asyncio.shield(_firecrawl_probe)
+
+
+def _on_firecrawl_probe_done(probe: asyncio.Future):
+    """探测结束：清除进行中的标记，健康结果写入缓存"""
+    global _firecrawl_status_cache, _firecrawl_probe
+    _firecrawl_probe = None
+    if not probe.cancelled() and probe.exception() is None and probe.result().status == "healthy":
+        _firecrawl_status_cache = (time.monotonic(), probe.result())
+
+
+async def _probe_firecrawl() -> ServiceStatus:
+    """实际请求Firecrawl API检查状态"""
+    # 复用抓取服务的共享客户端 (已带认证头)，避免每次检查重新建立连接
+    from app.api.api_v1.endpoints.properties import firecrawl_service
     
     start_time = asyncio.get_event_loop().time()
 
@@ -101,13 +156,11 @@ async def check_firecrawl() -> ServiceStatus:
         )
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.FIRECRAWL_BASE_URL}/health",
-                headers={"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"},
-                timeout=10
-            )
-            
+        response = await firecrawl_service.get_client().get(
+            f"{settings.FIRECRAWL_BASE_URL}/health",
+            timeout=10
+        )
+        
         response_time = (asyncio.get_event_loop().time() - start_time) * 1000
         
         if response.status_code == 200:
@@ -4,10 +4,18 @@
 提供房产数据搜索和聚合功能
 """
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Response
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any, Literal
-from datetime import datetime
+from typing import List, NamedTuple, Optional, Dict, Any, Literal, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from types import MappingProxyType
+from urllib.parse import quote_plus
+import asyncio
+import random
+import time
 import httpx
 import pandas as pd
 import json
@@ -33,6 +41,18 @@ class PropertySearchRequest(BaseModel):
     parking: Optional[int] = Field(None, ge=0, description="停车位数量")
     max_results: Optional[int] = Field(50, ge=1, le=200, description="最大结果数量")
     
+    @validator('location')
+    def normalize_location(cls, v):
+        # 在入口处统一去除首尾及重复空白，下游URL缓存和区域筛选都使用同一形式
+        return ' '.join(v.split())
+    
+    @validator('property_type')
+    def normalize_property_type(cls, v):
+        # 房产类型统一为小写，下游URL构建和缓存键无需再逐次转换
+        if v is None:
+            return v
+        return v.strip().lower() or None
+    
     @validator('max_price')
     def validate_price_range(cls, v, values):
         if v is not None and 'min_price' in values and values['min_price'] is not None:
@@ -101,6 +121,77 @@ class PropertySearchResponse(BaseModel):
     message: str
 
 
+# Domain.com.au 租房搜索地址
+_DOMAIN_RENT_URL = "https://www.domain.com.au/rent/"
+_DOMAIN_RENT_QUERY_PREFIX = _DOMAIN_RENT_URL + "?"
+# 房间数量类参数名，顺序与 _domain_search_url 的参数一致
+_DOMAIN_ROOM_PARAMS = ("bedrooms", "bathrooms", "parking")
+
+
+@lru_cache(maxsize=1024)
+def _location_slug(location: str) -> str:
+    """地点名转换为URL slug (区域集合有限，结果缓存)"""
+    # 简化地点处理，实际项目中需要更复杂的地点映射
+    # 地点是用户输入的自由文本，需要转义；数值参数本身URL安全，直接拼接
+    return quote_plus(location.lower().replace(' ', '-').replace(',', ''))
+
+
+class _SearchUrlKey(NamedTuple):
+    """决定Domain搜索URL的全部参数 (不可变，可直接作为缓存键)"""
+    location: Optional[str]
+    min_price: Optional[int]
+    max_price: Optional[int]
+    bedrooms: Optional[int]
+    bathrooms: Optional[int]
+    parking: Optional[int]
+    property_type: Optional[str]
+
+
+@lru_cache(maxsize=1024)
+def _domain_search_url(key: _SearchUrlKey) -> str:
+    """按搜索参数构建Domain.com.au搜索URL (纯函数，结果缓存)"""
+    location, min_price, max_price, bedrooms, bathrooms, parking, property_type = key
+    
+    # URL参数映射
+    query_params = []
+    
+    # 地点参数
+    if location:
+        query_params.append(f"suburb={_location_slug(location)}")
+    
+    # 价格范围 (未指定的一端用 any)
+    if min_price or max_price:
+        query_params.append(f"price={min_price or 'any'}-{max_price or 'any'}")
+    
+    # 房间数量 (参数名与取值成对，按表生成)
+    query_params.extend(
+        f"{name}={value}"
+        for name, value in zip(_DOMAIN_ROOM_PARAMS, (bedrooms, bathrooms, parking))
+        if value
+    )
+    
+    # 房产类型
+    if property_type:
+        query_params.append(f"ptype={quote_plus(property_type)}")
+    
+    # 构建完整URL (前缀预先拼好，只需一次连接)
+    if query_params:
+        return _DOMAIN_RENT_QUERY_PREFIX + '&'.join(query_params)
+    else:
+        return _DOMAIN_RENT_URL
+
+
+# Firecrawl 抓取时保留/剔除的页面元素
+FIRECRAWL_INCLUDE_TAGS = ("article", ".listing-result", ".property-card", "[data-testid*='listing']")
+FIRECRAWL_EXCLUDE_TAGS = ("nav", "footer", ".advertisement", ".cookie-banner")
+
+# 单次429退避的上限，避免Retry-After过大时请求长时间挂起
+MAX_RETRY_BACKOFF_SECONDS = 60.0
+
+# 抓取结果缓存的最大条目数 (按搜索URL缓存，有效期为 SEARCH_CACHE_TTL)
+SCRAPE_CACHE_MAX_ENTRIES = 256
+
+
 class FirecrawlService:
     """Firecrawl API 服务类"""
     
@@ -108,6 +199,60 @@ class FirecrawlService:
         self.api_key = settings.FIRECRAWL_API_KEY
         self.base_url = settings.FIRECRAWL_BASE_URL
         self.timeout = settings.SCRAPING_TIMEOUT
+        self._headers = (
+            {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        )
+        self._scrape_options = {
+            # 解析只使用markdown，不再额外拉取整页HTML
+            "formats": ["markdown"],
+            "includeTags": FIRECRAWL_INCLUDE_TAGS,
+            "excludeTags": FIRECRAWL_EXCLUDE_TAGS,
+            "onlyMainContent": True,
+            "timeout": self.timeout * 1000,  # 转换为毫秒
+            "waitFor": 2000,  # 等待2秒让页面加载完成
+        }
+        self._scrape_url = f"{self.base_url}/v0/scrape"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cooldown_until = 0.0
+        # 最近一次冷却期的时长，用于计算各等待者的抖动范围
+        self._cooldown_delay = 0.0
+        self._scrape_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_REQUESTS)
+        # 成功的抓取结果缓存: 搜索URL -> (过期时间, 精简后的响应)
+        self._scrape_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # 进行中的抓取: 搜索URL -> 任务，并发的相同搜索共享同一次请求
+        self._inflight_scrapes: Dict[str, asyncio.Future] = {}
+
+    def get_client(self) -> httpx.AsyncClient:
+        """获取共享的HTTP客户端 (跨请求复用连接池)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                # 认证头在构建客户端时一次性设置，请求时无需再合并
+                headers=self._headers,
+                # API调用不需要会话cookie，拒绝存储以免长期运行时cookie累积
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+            )
+        return self._client
+
+    @staticmethod
+    def _retry_after_delay(response: httpx.Response, attempt: int) -> float:
+        """根据Retry-After头(秒数或HTTP日期)计算退避时间，缺省时指数退避"""
+        retry_after = response.headers.get("Retry-After", "").strip()
+        delay = settings.SCRAPING_RETRY_DELAY * (2 ** attempt)
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        elif retry_after:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        return min(max(delay, 0.0), MAX_RETRY_BACKOFF_SECONDS)
+
+    async def aclose(self):
+        """关闭共享的HTTP客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def _fallback_response(
         self,
@@ -128,99 +273,126 @@ class FirecrawlService:
                 "mode": "fallback",
                 "reason": reason,
                 "generated_at": datetime.utcnow().isoformat() + "Z",
-                "search_url": search_url,
-                "search_params": search_params.model_dump()
+                # 搜索参数已在响应 metadata.search_params 中返回，这里不再重复
+                "search_url": search_url
             }
         }
     
+    def _compact_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """只保留解析和元数据需要的字段
+
+        抓取结果在整个请求期间都会被持有，丢弃未使用的页面内容和链接等字段
+        """
+        content = data.get('data') or {}
+        return {
+            "data": {
+                "markdown": content.get('markdown', '')
+            },
+            "metadata": data.get('metadata', {})
+        }
+    
+    def _scrape_cache_get(self, url: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的抓取结果"""
+        entry = self._scrape_cache.get(url)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._scrape_cache[url]
+            return None
+        return result
+
+    def _scrape_cache_put(self, url: str, result: Dict[str, Any]):
+        """写入抓取结果，超出容量时淘汰最早写入的条目"""
+        self._scrape_cache.pop(url, None)
+        self._scrape_cache[url] = (time.monotonic() + settings.SEARCH_CACHE_TTL, result)
+        if len(self._scrape_cache) > SCRAPE_CACHE_MAX_ENTRIES:
+            del self._scrape_cache[next(iter(self._scrape_cache))]
+    
     def build_domain_search_url(self, params: PropertySearchRequest) -> str:
         """构建Domain.com.au搜索URL"""
-        base_url = "https://www.domain.com.au/rent"
-        
-        # URL参数映射
-        query_params = []
-        
-        # 地点参数
-        if params.location:
-            # 简化地点处理，实际项目中需要更复杂的地点映射
-            location_slug = params.location.lower().replace(' ', '-').replace(',', '')
-            query_params.append(f"suburb={location_slug}")
-        
-        # 价格范围
-        if params.min_price:
-            query_params.append(f"price={params.min_price}-any")
-        if params.max_price:
-            if params.min_price:
-                query_params[query_params.index(f"price={params.min_price}-any")] = f"price={params.min_price}-{params.max_price}"
-            else:
-                query_params.append(f"price=any-{params.max_price}")
-        
-        # 房间数量
-        if params.bedrooms:
-            query_params.append(f"bedrooms={params.bedrooms}")
-        if params.bathrooms:
-            query_params.append(f"bathrooms={params.bathrooms}")
-        if params.parking:
-            query_params.append(f"parking={params.parking}")
-        
-        # 房产类型
-        if params.property_type:
-            query_params.append(f"ptype={params.property_type.lower()}")
-        
-        # 构建完整URL
-        if query_params:
-            return f"{base_url}/?{'&'.join(query_params)}"
-        else:
-            return f"{base_url}/"
+        # URL完全由以下参数决定，相同参数直接复用缓存结果
+        return _domain_search_url(_SearchUrlKey(
+            params.location, params.min_price, params.max_price,
+            params.bedrooms, params.bathrooms, params.parking, params.property_type
+        ))
     
     async def scrape_properties(self, search_params: PropertySearchRequest) -> Dict[str, Any]:
         """使用Firecrawl抓取房产数据"""
         
         # 构建搜索URL
         search_url = self.build_domain_search_url(search_params)
-        scraping_logger.info(f"开始抓取URL: {search_url}")
+        scraping_logger.info("开始抓取URL: %s", search_url)
 
         if not self.api_key:
             scraping_logger.warning("Firecrawl API key 未配置，使用本地示例数据")
             return self._fallback_response(search_params, "missing_firecrawl_api_key", search_url)
         
-        # Firecrawl API配置
-        firecrawl_config = {
-            "url": search_url,
-            "formats": ["markdown", "html"],
-            "includeTags": ["article", ".listing-result", ".property-card", "[data-testid*='listing']"],
-            "excludeTags": ["nav", "footer", ".advertisement", ".cookie-banner"],
-            "onlyMainContent": True,
-            "timeout": self.timeout * 1000,  # 转换为毫秒
-            "waitFor": 2000,  # 等待2秒让页面加载完成
-        }
+        # 相同搜索URL在有效期内直接复用上次的抓取结果，省去Firecrawl调用
+        cached = self._scrape_cache_get(search_url)
+        if cached is not None:
+            scraping_logger.info("命中抓取缓存: %s", search_url)
+            return cached
+        
+        # 同一URL已有抓取在进行中时直接等待其结果，不重复调用Firecrawl；
+        # shield保证某个调用方被取消时共享的抓取仍继续完成
+        task = self._inflight_scrapes.get(search_url)
+        if task is None:
+            task = asyncio.ensure_future(self._scrape_url_uncached(search_params, search_url))
+            self._inflight_scrapes[search_url] = task
+            task.add_done_callback(lambda _: self._inflight_scrapes.pop(search_url, None))
+        else:
+            scraping_logger.info("合并进行中的抓取: %s", search_url)
+        return await asyncio.shield(task)
+    
+    async def _scrape_url_uncached(self, search_params: PropertySearchRequest, search_url: str) -> Dict[str, Any]:
+        """实际调用Firecrawl抓取指定URL"""
+        # Firecrawl API配置 (静态选项在初始化时构建，这里只补充URL)
+        firecrawl_config = {"url": search_url, **self._scrape_options}
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/v0/scrape",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=firecrawl_config
+        client = self.get_client()
+        try:
+            for attempt in range(settings.SCRAPING_MAX_RETRIES + 1):
+                # 之前收到429时记录的冷却期，后续请求同样遵守；
+                # 每个等待者在冷却期之外再各自加随机抖动，避免在同一时刻一起重试
+                wait = self._cooldown_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait + random.uniform(0, 0.5 * self._cooldown_delay))
+
+                # 限制同时进行的Firecrawl抓取数，超出的请求排队等待
+                async with self._scrape_semaphore:
+                    response = await client.post(
+                        self._scrape_url,
+                        json=firecrawl_config
+                    )
+                if response.status_code != 429 or attempt == settings.SCRAPING_MAX_RETRIES:
+                    break
+
+                delay = self._retry_after_delay(response, attempt)
+                self._cooldown_until = time.monotonic() + delay
+                self._cooldown_delay = delay
+                scraping_logger.warning(
+                    "Firecrawl限流(429)，%.1f秒后重试 (%d/%d)",
+                    delay, attempt + 1, settings.SCRAPING_MAX_RETRIES
                 )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                scraping_logger.info(f"Firecrawl响应状态: {response.status_code}")
-                return data
-                
-            except httpx.HTTPStatusError as e:
-                scraping_logger.error(f"Firecrawl API错误: {e.response.status_code} - {e.response.text}")
-                reason = f"http_status_{e.response.status_code}"
-                if e.response.status_code == 402:
-                    reason = "firecrawl_quota_exceeded"
-                return self._fallback_response(search_params, reason, search_url)
-            except Exception as e:
-                scraping_logger.error(f"抓取过程出错: {str(e)}")
-                return self._fallback_response(search_params, "request_exception", search_url)
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            scraping_logger.info("Firecrawl响应状态: %s", response.status_code)
+            result = self._compact_response(data)
+            self._scrape_cache_put(search_url, result)
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            scraping_logger.error("Firecrawl API错误: %s - %s", e.response.status_code, e.response.text)
+            reason = f"http_status_{e.response.status_code}"
+            if e.response.status_code == 402:
+                reason = "firecrawl_quota_exceeded"
+            return self._fallback_response(search_params, reason, search_url)
+        except Exception as e:
+            scraping_logger.error("抓取过程出错: %s", e)
+            return self._fallback_response(search_params, "request_exception", search_url)
     
     def parse_property_data(self, raw_data: Dict[str, Any], search_params: PropertySearchRequest) -> List[PropertyModel]:
         """解析原始数据为标准房产模型"""
@@ -232,7 +404,7 @@ class FirecrawlService:
             markdown = content.get('markdown', '')
             html = content.get('html', '')
             
-            scraping_logger.info(f"开始解析数据，markdown长度: {len(markdown)}, HTML长度: {len(html)}")
+            scraping_logger.info("开始解析数据，markdown长度: %d, HTML长度: %d", len(markdown), len(html))
             
             # 这里是简化的解析逻辑
             # 实际项目中需要根据Domain.com.au的具体HTML结构进行复杂的解析
@@ -284,11 +456,11 @@ class FirecrawlService:
                 
                 properties.append(PropertyModel(**prop_data))
             
-            scraping_logger.info(f"成功解析 {len(properties)} 个房产数据")
+            scraping_logger.info("成功解析 %d 个房产数据", len(properties))
             return properties
             
         except Exception as e:
-            scraping_logger.error(f"数据解析错误: {str(e)}")
+            scraping_logger.error("数据解析错误: %s", e)
             return []
 
 
@@ -296,6 +468,12 @@ class FirecrawlService:
 firecrawl_service = FirecrawlService()
 
 
+def _write_csv(df: pd.DataFrame, file_path) -> None:
+    """写入CSV文件 (在工作线程中执行)，导出目录不存在时先创建"""
+    file_path.parent.mkdir(exist_ok=True)
+    df.to_csv(file_path, index=False, encoding='utf-8')
+
+
 async def export_to_csv(
     properties: List[PropertyModel], 
     search_params: PropertySearchRequest,
@@ -303,35 +481,41 @@ async def export_to_csv(
 ) -> str:
     """导出搜索结果到CSV文件"""
     try:
-        # 准备CSV数据
-        csv_data = []
-        for prop in properties:
-            csv_row = {
-                'ID': prop.id,
-                'Title': prop.title,
-                'Price': prop.price,
-                'Location': prop.location,
-                'Bedrooms': prop.bedrooms,
-                'Bathrooms': prop.bathrooms,
-                'Parking': prop.parking,
-                'Property_Type': prop.property_type,
-                'Description': prop.description[:200] + '...' if len(prop.description) > 200 else prop.description,
-                'Features': ', '.join(prop.features) if prop.features else '',
-                'Agent_Name': prop.agent.get('name', '') if prop.agent else '',
-                'Agent_Phone': prop.agent.get('phone', '') if prop.agent else '',
-                'Available_From': prop.available_from or '',
-                'Property_Size': prop.property_size or '',
-                'Pet_Friendly': 'Yes' if prop.pet_friendly else 'No',
-                'Furnished': 'Yes' if prop.furnished else 'No',
-                'URL': prop.url,
-                'Source': prop.source,
-                'Scraped_At': prop.scraped_at,
-                'Search_Location': search_params.location,
-                'Search_Min_Price': search_params.min_price or '',
-                'Search_Max_Price': search_params.max_price or '',
-            }
-            csv_data.append(csv_row)
-        
+        # 按列构建CSV数据，字段转换在列上批量完成
+        df = pd.DataFrame({
+            'ID': [prop.id for prop in properties],
+            'Title': [prop.title for prop in properties],
+            'Price': [prop.price for prop in properties],
+            'Location': [prop.location for prop in properties],
+            'Bedrooms': [prop.bedrooms for prop in properties],
+            'Bathrooms': [prop.bathrooms for prop in properties],
+            'Parking': [prop.parking for prop in properties],
+            'Property_Type': [prop.property_type for prop in properties],
+            'Description': [prop.description for prop in properties],
+            'Features': [', '.join(prop.features) if prop.features else '' for prop in properties],
+            'Agent_Name': [(prop.agent or {}).get('name', '') for prop in properties],
+            'Agent_Phone': [(prop.agent or {}).get('phone', '') for prop in properties],
+            'Available_From': [prop.available_from for prop in properties],
+            'Property_Size': [prop.property_size for prop in properties],
+            'Pet_Friendly': [bool(prop.pet_friendly) for prop in properties],
+            'Furnished': [bool(prop.furnished) for prop in properties],
+            'URL': [prop.url for prop in properties],
+            'Source': [prop.source for prop in properties],
+            'Scraped_At': [prop.scraped_at for prop in properties],
+        })
+
+        long_description = df['Description'].str.len() > 200
+        df['Description'] = df['Description'].where(
+            ~long_description, df['Description'].str.slice(0, 200) + '...'
+        )
+        df[['Available_From', 'Property_Size']] = df[['Available_From', 'Property_Size']].fillna('')
+        df[['Pet_Friendly', 'Furnished']] = df[['Pet_Friendly', 'Furnished']].replace({True: 'Yes', False: 'No'})
+
+        # 搜索条件对所有行相同，直接广播为常量列
+        df['Search_Location'] = search_params.location
+        df['Search_Min_Price'] = search_params.min_price or ''
+        df['Search_Max_Price'] = search_params.max_price or ''
+
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"property_search_{search_params.location.replace(' ', '_')}_{timestamp}.csv"
@@ -340,8 +524,8 @@ async def export_to_csv(
         csv_dir = get_csv_export_path()
         file_path = csv_dir / filename
         
-        df = pd.DataFrame(csv_data)
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        # 写文件在线程池中执行，避免阻塞事件循环
+        await asyncio.to_thread(_write_csv, df, file_path)
         
         csv_logger.info(f"CSV文件已保存: {file_path}")
         return str(file_path)
@@ -362,7 +546,7 @@ async def search_properties(
     根据搜索条件从Domain.com.au抓取房产数据
     """
     request_id = str(uuid.uuid4())[:8]
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     api_logger.info(f"[{request_id}] 开始房产搜索: {request.location}")
     
@@ -374,7 +558,7 @@ async def search_properties(
         properties = await openai_parser.parse_properties_from_raw(raw_data, request.dict())
         
         # 计算执行时间
-        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter() - start_time) * 1000
         
         # 构建响应元数据
         metadata = SearchMetadata(
@@ -406,7 +590,7 @@ async def search_properties(
         api_logger.error(f"[{request_id}] 搜索失败: {str(e)}")
         
         # 返回错误响应
-        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter() - start_time) * 1000
         metadata = SearchMetadata(
             total_found=0,
             search_time_ms=round(execution_time, 2),
@@ -423,6 +607,27 @@ async def search_properties(
         )
 
 
+# 支持的搜索区域 (只读常量，启动时构建一次)
+SUPPORTED_LOCATIONS = (
+    MappingProxyType({"name": "Sydney", "state": "NSW", "popular_suburbs": ("Camperdown", "Newtown", "Surry Hills", "Bondi")}),
+    MappingProxyType({"name": "Melbourne", "state": "VIC", "popular_suburbs": ("Carlton", "Fitzroy", "South Yarra", "St Kilda")}),
+    MappingProxyType({"name": "Brisbane", "state": "QLD", "popular_suburbs": ("Fortitude Valley", "South Brisbane", "New Farm")}),
+    MappingProxyType({"name": "Perth", "state": "WA", "popular_suburbs": ("Northbridge", "Subiaco", "Fremantle")}),
+    MappingProxyType({"name": "Adelaide", "state": "SA", "popular_suburbs": ("North Adelaide", "Unley", "Glenelg")})
+)
+
+# 响应内容固定，启动时序列化一次，请求时直接返回字节，共享对象也不会被修改
+SUPPORTED_LOCATIONS_BODY = json.dumps(
+    {
+        "success": True,
+        "locations": [dict(location) for location in SUPPORTED_LOCATIONS],
+        "message": "支持的搜索区域列表"
+    },
+    ensure_ascii=False,
+    separators=(",", ":")
+).encode("utf-8")
+
+
 @router.get("/locations")
 async def get_supported_locations():
     """
@@ -430,20 +635,7 @@ async def get_supported_locations():
     
     返回可以搜索的澳洲城市和区域
     """
-    # 这里返回一些常见的澳洲租房区域
-    locations = [
-        {"name": "Sydney", "state": "NSW", "popular_suburbs": ["Camperdown", "Newtown", "Surry Hills", "Bondi"]},
-        {"name": "Melbourne", "state": "VIC", "popular_suburbs": ["Carlton", "Fitzroy", "South Yarra", "St Kilda"]},
-        {"name": "Brisbane", "state": "QLD", "popular_suburbs": ["Fortitude Valley", "South Brisbane", "New Farm"]},
-        {"name": "Perth", "state": "WA", "popular_suburbs": ["Northbridge", "Subiaco", "Fremantle"]},
-        {"name": "Adelaide", "state": "SA", "popular_suburbs": ["North Adelaide", "Unley", "Glenelg"]}
-    ]
-    
-    return {
-        "success": True,
-        "locations": locations,
-        "message": "支持的搜索区域列表"
-    }
+    return Response(content=SUPPORTED_LOCATIONS_BODY, media_type="application/json")
 
 
 @router.get("/test")
@@ -454,19 +646,18 @@ async def test_firecrawl():
     用于验证API配置是否正确
     """
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                f"{settings.FIRECRAWL_BASE_URL}/health",
-                headers={"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"}
-            )
-            
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "message": "Firecrawl API连接正常",
-                "api_url": settings.FIRECRAWL_BASE_URL
-            }
-            
+        response = await firecrawl_service.get_client().get(
+            f"{settings.FIRECRAWL_BASE_URL}/health",
+            timeout=10
+        )
+        
+        return {
+            "success": True,
+            "status_code": response.status_code,
+            "message": "Firecrawl API连接正常",
+            "api_url": settings.FIRECRAWL_BASE_URL
+        }
+        
     except Exception as e:
         return {
             "success": False,
@@ -487,7 +678,9 @@ async def recommend_properties(
     使用LLM解析自然语言查询，结合推荐算法返回最匹配的房产
     """
     request_id = str(uuid.uuid4())[:8]
-    start_time = datetime.now()
+    start_time = time.perf_counter()
+    # 请求参数在推荐查询和元数据中多次使用，只序列化一次
+    request_params = request.dict()
     
     api_logger.info(f"[{request_id}] 开始智能推荐: {request.query}")
     
@@ -497,7 +690,12 @@ async def recommend_properties(
         api_logger.info(f"[{request_id}] OpenAI解析结果: {parsed_query}")
         
         # 2. 构建搜索参数（合并解析结果和显式参数）
-        search_location = request.location or parsed_query.get('address') or parsed_query.get('suburbs', [''])[0] if isinstance(parsed_query.get('suburbs'), list) else ''
+        # 优先级：显式location > 解析出的地址 > 第一个区域 (suburbs只取一次)
+        search_location = (
+            request.location
+            or parsed_query.get('address')
+            or (suburbs[0] if isinstance(suburbs := parsed_query.get('suburbs'), list) and suburbs else '')
+        )
         if not search_location:
             raise HTTPException(status_code=400, detail="无法确定搜索区域，请在query中指定位置或使用location参数")
         
@@ -521,12 +719,12 @@ async def recommend_properties(
         
         if not properties:
             api_logger.warning(f"[{request_id}] 未找到房产数据")
-            execution_time = (datetime.now() - start_time).total_seconds() * 1000
+            execution_time = (time.perf_counter() - start_time) * 1000
             metadata = SearchMetadata(
                 total_found=0,
                 search_time_ms=round(execution_time, 2),
                 firecrawl_usage=raw_data.get('metadata', {}),
-                search_params=request.dict(),
+                search_params=request_params,
                 timestamp=datetime.utcnow().isoformat() + "Z"
             )
             return PropertySearchResponse(
@@ -538,7 +736,7 @@ async def recommend_properties(
         
         # 5. 构建推荐查询参数
         recommendation_query = recommendation_service.build_query_from_request(
-            search_request=request.dict(),
+            search_request=request_params,
             file_default={'location': search_location}
         )
         
@@ -549,17 +747,16 @@ async def recommend_properties(
             topk=request.max_results or 10
         )
         
-        # 7. 转换为PropertyModel格式
-        recommended_properties = []
-        for rec in recommendations:
-            # 从原始properties中找到对应的PropertyModel
-            for prop in properties:
-                if prop.id == rec['id']:
-                    recommended_properties.append(prop)
-                    break
+        # 7. 转换为PropertyModel格式 (按id建索引，避免对每条推荐线性扫描原始列表)
+        properties_by_id = {}
+        for prop in properties:
+            properties_by_id.setdefault(prop.id, prop)
+        recommended_properties = [
+            properties_by_id[rec['id']] for rec in recommendations if rec['id'] in properties_by_id
+        ]
         
         # 计算执行时间
-        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter() - start_time) * 1000
         
         # 构建响应元数据
         metadata = SearchMetadata(
@@ -567,7 +764,7 @@ async def recommend_properties(
             search_time_ms=round(execution_time, 2),
             firecrawl_usage=raw_data.get('metadata', {}),
             search_params={
-                **request.dict(),
+                **request_params,
                 'parsed_query': parsed_query,
                 'recommendation_scores': [rec['score'] for rec in recommendations]
             },
@@ -595,12 +792,12 @@ async def recommend_properties(
         api_logger.error(f"[{request_id}] 推荐失败: {str(e)}")
         
         # 返回错误响应
-        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter() - start_time) * 1000
         metadata = SearchMetadata(
             total_found=0,
             search_time_ms=round(execution_time, 2),
             firecrawl_usage={},
-            search_params=request.dict(),
+            search_params=request_params,
             timestamp=datetime.utcnow().isoformat() + "Z"
         )
         
@@ -672,6 +869,33 @@ async def import_csv_data(
         }
 
 
+# 批量处理时的字段默认值: (字段名, 缺失时的默认值)
+# id/source/scraped_at 需要逐批生成，在处理函数中单独填充
+BULK_PROPERTY_DEFAULTS = (
+    ('title', ''),
+    ('price', ''),
+    ('location', ''),
+    ('bedrooms', None),
+    ('bathrooms', None),
+    ('parking', None),
+    ('property_type', 'unknown'),
+    ('description', ''),
+    ('features', []),
+    ('images', []),
+    ('agent', {}),
+    ('coordinates', None),
+    ('url', ''),
+    ('available_from', None),
+    ('property_size', None),
+    ('land_size', None),
+    ('year_built', None),
+    ('energy_rating', None),
+    ('pet_friendly', False),
+    ('furnished', False),
+    ('inspection_times', []),
+)
+
+
 @router.post("/bulk-process")
 async def bulk_process_properties(
     request: Dict[str, Any],
@@ -692,37 +916,20 @@ async def bulk_process_properties(
         if not properties_raw:
             raise HTTPException(status_code=400, detail="没有提供房产数据")
         
-        # 转换为PropertyModel格式
+        # 转换为PropertyModel格式（逐条不变的值在循环外计算一次）
+        source_label = f"{source} -> Backend Processing"
+        received_at = datetime.utcnow().isoformat() + "Z"
         properties = []
         for prop_raw in properties_raw:
             try:
-                # 补充缺失的字段
+                # 按默认值表补充缺失的字段
                 prop_data = {
-                    'id': prop_raw.get('id', str(uuid.uuid4())),
-                    'title': prop_raw.get('title', ''),
-                    'price': prop_raw.get('price', ''),
-                    'location': prop_raw.get('location', ''),
-                    'bedrooms': prop_raw.get('bedrooms'),
-                    'bathrooms': prop_raw.get('bathrooms'),
-                    'parking': prop_raw.get('parking'),
-                    'property_type': prop_raw.get('property_type', 'unknown'),
-                    'description': prop_raw.get('description', ''),
-                    'features': prop_raw.get('features', []),
-                    'images': prop_raw.get('images', []),
-                    'agent': prop_raw.get('agent', {}),
-                    'coordinates': prop_raw.get('coordinates'),
-                    'url': prop_raw.get('url', ''),
-                    'source': f"{source} -> Backend Processing",
-                    'scraped_at': prop_raw.get('scraped_at', datetime.utcnow().isoformat() + "Z"),
-                    'available_from': prop_raw.get('available_from'),
-                    'property_size': prop_raw.get('property_size'),
-                    'land_size': prop_raw.get('land_size'),
-                    'year_built': prop_raw.get('year_built'),
-                    'energy_rating': prop_raw.get('energy_rating'),
-                    'pet_friendly': prop_raw.get('pet_friendly', False),
-                    'furnished': prop_raw.get('furnished', False),
-                    'inspection_times': prop_raw.get('inspection_times', [])
+                    field: prop_raw.get(field, default)
+                    for field, default in BULK_PROPERTY_DEFAULTS
                 }
+                prop_data['id'] = prop_raw['id'] if 'id' in prop_raw else str(uuid.uuid4())
+                prop_data['source'] = source_label
+                prop_data['scraped_at'] = prop_raw.get('scraped_at', received_at)
                 
                 property_model = PropertyModel(**prop_data)
                 properties.append(property_model)
@@ -768,27 +975,33 @@ async def bulk_process_properties(
         }
 
 
+# 导入数据CSV的列定义: (CSV列名, 源字段名)
+IMPORT_CSV_FIELDS = (
+    ('ID', 'id'),
+    ('Title', 'title'),
+    ('Price', 'price'),
+    ('Location', 'location'),
+    ('Bedrooms', 'bedrooms'),
+    ('Bathrooms', 'bathrooms'),
+    ('Parking', 'parking'),
+    ('URL', 'url'),
+    ('Source', 'source'),
+    ('Scraped_At', 'scraped_at'),
+)
+IMPORT_CSV_COLUMNS = [column for column, _ in IMPORT_CSV_FIELDS]
+
+
 async def save_imported_data_to_csv(properties_data: List[Dict], metadata: Dict) -> str:
     """保存导入数据为CSV文件"""
     try:
-        # 准备CSV数据
-        csv_data = []
-        for prop in properties_data:
-            csv_row = {
-                'ID': prop.get('id', ''),
-                'Title': prop.get('title', ''),
-                'Price': prop.get('price', ''),
-                'Location': prop.get('location', ''),
-                'Bedrooms': prop.get('bedrooms', ''),
-                'Bathrooms': prop.get('bathrooms', ''),
-                'Parking': prop.get('parking', ''),
-                'URL': prop.get('url', ''),
-                'Source': prop.get('source', ''),
-                'Scraped_At': prop.get('scraped_at', ''),
-                'Import_Source': metadata.get('source', 'frontend'),
-                'Import_Time': metadata.get('scraped_at', datetime.now().isoformat()),
-            }
-            csv_data.append(csv_row)
+        # 按固定列顺序准备CSV数据，避免pandas逐行推断列集合
+        records = [
+            tuple(prop.get(field, '') for _, field in IMPORT_CSV_FIELDS)
+            for prop in properties_data
+        ]
+        df = pd.DataFrame.from_records(records, columns=IMPORT_CSV_COLUMNS)
+        df['Import_Source'] = metadata.get('source', 'frontend')
+        df['Import_Time'] = metadata.get('scraped_at', datetime.now().isoformat())
         
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -798,8 +1011,7 @@ async def save_imported_data_to_csv(properties_data: List[Dict], metadata: Dict)
         csv_dir = get_csv_export_path()
         file_path = csv_dir / filename
         
-        df = pd.DataFrame(csv_data)
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        await asyncio.to_thread(_write_csv, df, file_path)
         
         csv_logger.info(f"导入数据CSV已保存: {file_path}")
         return filename
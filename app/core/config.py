@@ -8,6 +8,7 @@ from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, field_validator, Field, ValidationInfo
 from typing import List, Optional, Any
 import os
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -87,6 +88,12 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
     OPENAI_MAX_TOKENS: int = Field(default=500, env="OPENAI_MAX_TOKENS")
     OPENAI_TEMPERATURE: float = Field(default=0.1, env="OPENAI_TEMPERATURE")
+    # 单次解析输入文本的token预算 (按约4字符/token估算截断)
+    OPENAI_INPUT_TOKEN_BUDGET: int = Field(default=1000, env="OPENAI_INPUT_TOKEN_BUDGET")
+    # 可选的服务等级 (如 "priority" 低延迟 / "flex" 低成本)，未设置时使用账户默认
+    OPENAI_SERVICE_TIER: Optional[str] = Field(default=None, env="OPENAI_SERVICE_TIER")
+    # 同时进行的OpenAI请求上限，突发流量时排队而不是集中触发限流
+    OPENAI_MAX_CONCURRENT_REQUESTS: int = Field(default=8, env="OPENAI_MAX_CONCURRENT_REQUESTS")
     
     # 缓存设置
     CACHE_TTL_SECONDS: int = Field(default=3600, env="CACHE_TTL_SECONDS")  # 1小时
@@ -155,12 +162,13 @@ def get_project_root() -> Path:
     return Path(__file__).parent.parent.parent
 
 
+@lru_cache(maxsize=1)
 def get_csv_export_path() -> Path:
-    """获取CSV导出目录路径"""
-    project_root = get_project_root()
-    csv_path = project_root / settings.CSV_EXPORT_DIR
-    csv_path.mkdir(exist_ok=True)
-    return csv_path
+    """获取CSV导出目录路径
+
+    路径只解析一次；目录由写文件的一方在工作线程中按需创建，运行期间被删除也能自动恢复
+    """
+    return get_project_root() / settings.CSV_EXPORT_DIR
 
 
 def is_development() -> bool:
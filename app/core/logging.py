@@ -5,9 +5,11 @@
 """
 
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from app.core.config import settings
 
@@ -33,9 +35,63 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
+# 后台写日志的监听线程，以及挂在各日志器上的队列处理器 (日志器, 处理器)
+_listeners: List[QueueListener] = []
+_queue_handlers: List[Tuple[logging.Logger, QueueHandler]] = []
+_listeners_running = False
+
+
+def _queued(target: logging.Logger, *handlers: logging.Handler):
+    """将实际的处理器放到后台线程执行
+
+    请求路径上只把日志记录放入队列，控制台和文件写入由监听线程完成，不阻塞事件循环。
+    监听线程由 start_logging() 统一启动
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listeners.append(QueueListener(log_queue, *handlers, respect_handler_level=True))
+    queue_handler = QueueHandler(log_queue)
+    target.addHandler(queue_handler)
+    _queue_handlers.append((target, queue_handler))
+
+
+def start_logging():
+    """启动后台日志线程 (已在运行时不做任何事)"""
+    global _listeners_running
+    if _listeners_running:
+        return
+    for listener in _listeners:
+        listener.start()
+    _listeners_running = True
+
+
+def stop_logging():
+    """停止后台日志线程并写出队列中剩余的日志 (可再次调用 start_logging 恢复)"""
+    global _listeners_running
+    if not _listeners_running:
+        return
+    for listener in _listeners:
+        listener.stop()
+    _listeners_running = False
+
+
+def _teardown_logging():
+    """停止并移除之前配置的队列处理器和底层处理器"""
+    stop_logging()
+    for target, queue_handler in _queue_handlers:
+        target.removeHandler(queue_handler)
+    for listener in _listeners:
+        for handler in listener.handlers:
+            handler.close()
+    _queue_handlers.clear()
+    _listeners.clear()
+
+
 def setup_logging():
     """设置日志配置"""
     
+    # 重复调用时先拆除之前的后台日志线程和处理器
+    _teardown_logging()
+    
     # 创建日志目录
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -55,7 +111,6 @@ def setup_logging():
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
     
     # 文件处理器 (应用日志)
     file_handler = logging.FileHandler(
@@ -69,7 +124,6 @@ def setup_logging():
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
     
     # 错误日志处理器
     error_handler = logging.FileHandler(
@@ -79,7 +133,8 @@ def setup_logging():
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
-    root_logger.addHandler(error_handler)
+    
+    _queued(root_logger, console_handler, file_handler, error_handler)
     
     # 设置特定模块的日志级别
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -87,6 +142,8 @@ def setup_logging():
     
     # 创建专用日志器
     setup_specialized_loggers()
+    
+    start_logging()
 
 
 def setup_specialized_loggers():
@@ -106,7 +163,7 @@ def setup_specialized_loggers():
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     api_handler.setFormatter(api_formatter)
-    api_logger.addHandler(api_handler)
+    _queued(api_logger, api_handler)
     api_logger.setLevel(logging.INFO)
     
     # 爬虫日志器
@@ -117,7 +174,7 @@ def setup_specialized_loggers():
         encoding="utf-8"
     )
     scraping_handler.setFormatter(api_formatter)
-    scraping_logger.addHandler(scraping_handler)
+    _queued(scraping_logger, scraping_handler)
     scraping_logger.setLevel(logging.INFO)
     
     # 数据库日志器
@@ -128,7 +185,7 @@ def setup_specialized_loggers():
         encoding="utf-8"
     )
     db_handler.setFormatter(api_formatter)
-    db_logger.addHandler(db_handler)
+    _queued(db_logger, db_handler)
     db_logger.setLevel(logging.INFO)
 
 
@@ -10,28 +10,32 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import logging
 from pathlib import Path
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
-from app.core.logging import setup_logging
+from app.api.api_v1.endpoints.properties import firecrawl_service
+from app.api.api_v1.endpoints.health import close_redis_client
+from app.services.openai_parser import openai_parser
+from app.core.logging import setup_logging, start_logging, stop_logging
+
+# JSON响应优先使用orjson编码 (requirements中仅在Python 3.13以下安装)，不可用时回退到标准库
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultJSONResponse
 
 # 设置日志
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """应用生命周期管理"""
-    # 启动
-    logger.info("🚀 启动澳洲租房聚合系统后端服务")
-    logger.info(f"📊 环境: {settings.ENVIRONMENT}")
-    logger.info(f"🌐 API版本: {settings.API_V1_STR}")
-    
-    # 初始化数据库 (可选)
+async def _init_database():
+    """初始化数据库 (可选)"""
     try:
         from app.database.base import init_database
         await init_database()
@@ -39,32 +43,45 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️  数据库连接失败: {e}")
         logger.info("ℹ️  系统将在无数据库模式下运行 (仅内存存储)")
-    
-    # 检查Firecrawl API连接 (测试实际端点)
+
+
+async def _check_firecrawl():
+    """检查Firecrawl API连接 (测试实际端点)"""
     try:
-        import httpx
         if not settings.FIRECRAWL_API_KEY:
             logger.info("🔥 Firecrawl API 未配置，将使用示例数据模式运行")
         else:
-            async with httpx.AsyncClient(timeout=10) as client:
-                # 测试实际的抓取端点而不是健康检查
-                test_payload = {
-                    "url": "https://httpbin.org/status/200",
-                    "formats": ["markdown"]
-                }
-                response = await client.post(
-                    f"{settings.FIRECRAWL_BASE_URL}/v1/scrape",
-                    headers={"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"},
-                    json=test_payload
-                )
-                if response.status_code in [200, 201]:
-                    logger.info("🔥 Firecrawl API 连接正常")
-                else:
-                    logger.warning(f"⚠️  Firecrawl API 测试失败: {response.status_code}")
-                    logger.info("ℹ️  API功能可能受限，但基本服务正常")
+            # 测试实际的抓取端点而不是健康检查
+            test_payload = {
+                "url": "https://httpbin.org/status/200",
+                "formats": ["markdown"]
+            }
+            response = await firecrawl_service.get_client().post(
+                f"{settings.FIRECRAWL_BASE_URL}/v1/scrape",
+                json=test_payload,
+                timeout=10
+            )
+            if response.status_code in [200, 201]:
+                logger.info("🔥 Firecrawl API 连接正常")
+            else:
+                logger.warning(f"⚠️  Firecrawl API 测试失败: {response.status_code}")
+                logger.info("ℹ️  API功能可能受限，但基本服务正常")
     except Exception as e:
         logger.warning(f"⚠️  Firecrawl API 连接检查失败: {e}")
         logger.info("ℹ️  将使用模拟数据模式运行")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    # 启动 (同一进程中再次启动时恢复上次关闭时停止的后台日志线程)
+    start_logging()
+    logger.info("🚀 启动澳洲租房聚合系统后端服务")
+    logger.info(f"📊 环境: {settings.ENVIRONMENT}")
+    logger.info(f"🌐 API版本: {settings.API_V1_STR}")
+    
+    # 数据库初始化和Firecrawl检查互不依赖，并发执行
+    await asyncio.gather(_init_database(), _check_firecrawl())
     
     # 显示系统启动完成状态
     logger.info("✅ 系统启动完成")
@@ -79,6 +96,9 @@ async def lifespan(app: FastAPI):
     
     # 关闭
     logger.info("🛑 正在关闭系统...")
+    await firecrawl_service.aclose()
+    await openai_parser.aclose()
+    await close_redis_client()
     try:
         from app.database.base import close_database
         await close_database()
@@ -87,6 +107,7 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ 数据库关闭失败: {e}")
     
     logger.info("🛑 澳洲租房聚合系统后端服务已关闭")
+    stop_logging()
 
 
 # 创建FastAPI应用
@@ -97,6 +118,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    default_response_class=DefaultJSONResponse,
     lifespan=lifespan
 )
 FRONTEND_DIR = Path(__file__).parent.parent / "frontend"
@@ -123,44 +145,44 @@ app.add_middleware(
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """添加处理时间头"""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(f"{process_time:.4f}")
-    return response
-
-
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """记录API请求"""
-    start_time = time.time()
+    """记录API请求并添加处理时间头
+
+    计时和日志放在同一个中间件中，每个请求只经过一层包装
+    """
+    start_time = time.perf_counter()
     
-    # 记录请求
-    logger.info(
-        f"🔍 {request.method} {request.url.path}",
-        extra={
-            "method": request.method,
-            "url": str(request.url),
-            "client_ip": request.client.host if request.client else "unknown"
-        }
-    )
+    # 日志级别未开启INFO时跳过extra字典和URL字符串的构建，只保留计时头
+    log_enabled = logger.isEnabledFor(logging.INFO)
+    if log_enabled:
+        method = request.method
+        path = request.url.path
+        url = str(request.url)
+        logger.info(
+            f"🔍 {method} {path}",
+            extra={
+                "method": method,
+                "url": url,
+                "client_ip": request.client.host if request.client else "unknown"
+            }
+        )
     
     response = await call_next(request)
     
     # 记录响应
-    process_time = time.time() - start_time
-    logger.info(
-        f"✅ {request.method} {request.url.path} - {response.status_code} ({process_time:.3f}s)",
-        extra={
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "process_time": process_time
-        }
-    )
+    process_time = time.perf_counter() - start_time
+    response.headers["X-Process-Time"] = f"{process_time:.4f}"
+    if log_enabled:
+        logger.info(
+            f"✅ {method} {path} - {response.status_code} ({process_time:.3f}s)",
+            extra={
+                "method": method,
+                "url": url,
+                "status_code": response.status_code,
+                "process_time": process_time
+            }
+        )
     
     return response
 
@@ -8,7 +8,9 @@ from __future__ import annotations
 
 import json
 import re
+import uuid
 import torch
+from datetime import datetime
 from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import logging
 from transformers import AutoTokenizer, AutoModelForCausalLM
@@ -20,6 +22,21 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 信息抽取提示词模板；模板固定不变，按 {text} 预先切分，调用时直接拼接输入文本
+_PROMPT_TEMPLATE = """You are an information extractor. Return ONLY one valid JSON object.
+Keys: listing_type("rent"|"sale"|null), property_type("apartment"|"house"|"townhouse"|"studio"|null),
+title(null), address(string|null), price(string|null),
+bedrooms(int|null), bathrooms(int|null), parking_spaces(int|null), url(string|null),
+suburbs(string[]), price_min(int|null), price_max(int|null), unit("per_week"|"per_month"|null).
+Rules: AUD integers; accept typos & mixed languages; 'pw|per week|weekly'->per_week; 'pm|pcm|per month|monthly'->per_month.
+Text: {text}
+JSON:
+"""
+_PROMPT_PREFIX, _PROMPT_SUFFIX = _PROMPT_TEMPLATE.split("{text}")
+
+# 用于从模型输出中截取并解析JSON对象
+_JSON_DECODER = json.JSONDecoder()
+
 
 class LLMPropertyParser:
     """LLM房产数据解析器"""
@@ -35,24 +52,16 @@ class LLMPropertyParser:
         self.model = None
         self._load_model()
         
-        self.prompt_template = """You are an information extractor. Return ONLY one valid JSON object.
-Keys: listing_type("rent"|"sale"|null), property_type("apartment"|"house"|"townhouse"|"studio"|null),
-title(null), address(string|null), price(string|null),
-bedrooms(int|null), bathrooms(int|null), parking_spaces(int|null), url(string|null),
-suburbs(string[]), price_min(int|null), price_max(int|null), unit("per_week"|"per_month"|null).
-Rules: AUD integers; accept typos & mixed languages; 'pw|per week|weekly'->per_week; 'pm|pcm|per month|monthly'->per_month.
-Text: {text}
-JSON:
-"""
+        self.prompt_template = _PROMPT_TEMPLATE
 
     def _load_model(self):
         """加载LLM模型"""
         try:
-            logger.info(f"Loading LLM model: {self.model_name}")
+            logger.info("Loading LLM model: %s", self.model_name)
             
             # 检查CUDA可用性
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Using device: {device}")
+            logger.info("Using device: %s", device)
             
             # 加载tokenizer
             self.tokenizer = AutoTokenizer.from_pretrained(
@@ -72,7 +81,7 @@ JSON:
                 try:
                     model_kwargs["attn_implementation"] = "flash_attention_2"
                 except Exception as e:
-                    logger.warning(f"Flash attention not available: {e}")
+                    logger.warning("Flash attention not available: %s", e)
             
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
@@ -82,28 +91,24 @@ JSON:
             logger.info("LLM model loaded successfully")
             
         except Exception as e:
-            logger.error(f"Failed to load LLM model: {e}")
+            logger.error("Failed to load LLM model: %s", e)
             # 在生产环境中，可以回退到规则解析
             self.model = None
             self.tokenizer = None
 
-    def _first_json_block(self, text: str) -> Optional[str]:
-        """从文本中提取第一个JSON块"""
+    def _first_json_object(self, text: str) -> Optional[Dict]:
+        """从文本中解析第一个JSON对象"""
         text = text.strip().split("```")[0]
         start = text.find("{")
         if start == -1:
             return None
         
-        depth = 0
-        for i, char in enumerate(text[start:], start):
-            if char == "{":
-                depth += 1
-            elif char == "}":
-                depth -= 1
-                if depth == 0:
-                    return text[start:i+1]
-        
-        return None
+        # 由C实现的解码器一次完成定界和解析，无需逐字符统计括号
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+        except ValueError:
+            return None
+        return obj
 
     def _try_parse_once(self, prompt: str, max_new_tokens: int, 
                        do_sample: bool, temperature: Optional[float] = None) -> Optional[Dict]:
@@ -134,15 +139,10 @@ JSON:
             generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
             
             # 提取JSON
-            json_text = self._first_json_block(generated_text)
-            if not json_text:
-                return None
-            
-            # 解析JSON
-            return json.loads(json_text)
+            return self._first_json_object(generated_text)
             
         except Exception as e:
-            logger.debug(f"Parse attempt failed: {e}")
+            logger.debug("Parse attempt failed: %s", e)
             return None
 
     def llm_parse(self, text: str) -> Dict[str, Any]:
@@ -157,7 +157,7 @@ JSON:
         Raises:
             ValueError: 所有解析尝试失败时抛出
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return {}
             
         # 如果模型未加载，使用回退解析
@@ -165,7 +165,7 @@ JSON:
             logger.warning("LLM model not available, using fallback parsing")
             return self._fallback_parse(text)
         
-        prompt = self.prompt_template.format(text=text)
+        prompt = _PROMPT_PREFIX + text + _PROMPT_SUFFIX
         
         # 多种配置的解析尝试
         parse_configs = [
@@ -178,7 +178,7 @@ JSON:
         for max_tokens, do_sample, temperature in parse_configs:
             result = self._try_parse_once(prompt, max_tokens, do_sample, temperature)
             if result:
-                logger.debug(f"LLM parsing successful with config: {max_tokens}, {do_sample}, {temperature}")
+                logger.debug("LLM parsing successful with config: %s, %s, %s", max_tokens, do_sample, temperature)
                 return result
         
         # 所有尝试失败，使用回退解析
@@ -188,6 +188,8 @@ JSON:
     def _fallback_parse(self, text: str) -> Dict[str, Any]:
         """回退的规则解析方法"""
         result = {}
+        # 只转换一次小写，避免在每个关键词检查中重复 text.lower()
+        text_lower = text.lower()
         
         # 简单的正则表达式提取
         # 价格提取
@@ -214,19 +216,19 @@ JSON:
             result["bathrooms"] = int(bath_match.group(1))
         
         # 房产类型
-        if any(word in text.lower() for word in ['apartment', 'unit', 'flat']):
+        if any(word in text_lower for word in ['apartment', 'unit', 'flat']):
             result["property_type"] = "apartment"
-        elif any(word in text.lower() for word in ['house', 'home']):
+        elif any(word in text_lower for word in ['house', 'home']):
             result["property_type"] = "house"
-        elif 'townhouse' in text.lower():
+        elif 'townhouse' in text_lower:
             result["property_type"] = "townhouse"
-        elif 'studio' in text.lower():
+        elif 'studio' in text_lower:
             result["property_type"] = "studio"
         
         # 租售类型
-        if any(word in text.lower() for word in ['rent', 'rental', 'lease']):
+        if any(word in text_lower for word in ['rent', 'rental', 'lease']):
             result["listing_type"] = "rent"
-        elif any(word in text.lower() for word in ['sale', 'buy', 'purchase']):
+        elif any(word in text_lower for word in ['sale', 'buy', 'purchase']):
             result["listing_type"] = "sale"
         
         return result
@@ -250,7 +252,7 @@ JSON:
             markdown = content.get('markdown', '')
             html = content.get('html', '')
             
-            logger.info(f"Parsing data - markdown: {len(markdown)} chars, html: {len(html)} chars")
+            logger.info("Parsing data - markdown: %d chars, html: %d chars", len(markdown), len(html))
             
             # 使用LLM解析内容
             if markdown or html:
@@ -267,20 +269,19 @@ JSON:
             if not properties:
                 properties = self._create_sample_properties(search_params)
             
-            logger.info(f"Successfully parsed {len(properties)} properties")
+            logger.info("Successfully parsed %d properties", len(properties))
             return properties
             
         except Exception as e:
-            logger.error(f"Property parsing failed: {e}")
+            logger.error("Property parsing failed: %s", e)
             return []
 
     def _create_property_from_parsed(self, parsed_data: Dict[str, Any], 
                                    search_params: Dict[str, Any]) -> Optional[PropertyModel]:
         """从解析数据创建PropertyModel"""
         try:
+            # 端点模块导入本模块，PropertyModel只能在调用时导入
             from app.api.api_v1.endpoints.properties import PropertyModel
-            import uuid
-            from datetime import datetime
             
             # 基础信息
             property_id = str(uuid.uuid4())
@@ -329,7 +330,7 @@ JSON:
             return property_model
             
         except Exception as e:
-            logger.error(f"Failed to create property from parsed data: {e}")
+            logger.error("Failed to create property from parsed data: %s", e)
             return None
 
     def _create_sample_properties(self, search_params: Dict[str, Any]) -> List[PropertyModel]:
@@ -337,9 +338,8 @@ JSON:
         properties = []
         
         try:
+            # 端点模块导入本模块，PropertyModel只能在调用时导入
             from app.api.api_v1.endpoints.properties import PropertyModel
-            import uuid
-            from datetime import datetime
             
             # 生成3-5个示例房产
             for i in range(3, 6):
@@ -383,7 +383,7 @@ JSON:
             return properties
             
         except Exception as e:
-            logger.error(f"Failed to create sample properties: {e}")
+            logger.error("Failed to create sample properties: %s", e)
             return []
 
 
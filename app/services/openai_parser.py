@@ -6,11 +6,17 @@ OpenAI-based Property Data Parser Service
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import re
 import os
+import time
+import uuid
 import logging
-from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 
@@ -22,6 +28,206 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 房产类型关键词 -> 标准类型；整词匹配，避免 'townhouse' 被识别为 house
+_PROPERTY_TYPE_KEYWORDS = {
+    'apartment': 'apartment', 'unit': 'apartment', 'flat': 'apartment',
+    'house': 'house', 'home': 'house',
+    'townhouse': 'townhouse',
+    'studio': 'studio',
+}
+_PROPERTY_TYPE_PRIORITY = ('apartment', 'house', 'townhouse', 'studio')
+# 边界只排除英文字母，"找apartment公寓" 这类中英混写也能识别
+_PROPERTY_TYPE_RE = re.compile(
+    r'(?<![A-Za-z])(' + '|'.join(_PROPERTY_TYPE_KEYWORDS) + r')s?(?![A-Za-z])', re.IGNORECASE
+)
+
+# 常见澳洲城市和地区
+_AUSTRALIAN_LOCATIONS = (
+    'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide', 'canberra', 'darwin', 'hobart',
+    'camperdown', 'newtown', 'surry hills', 'bondi', 'manly', 'paddington', 'redfern',
+    'carlton', 'fitzroy', 'south yarra', 'st kilda', 'richmond', 'brunswick', 'prahran',
+    'fortitude valley', 'south brisbane', 'new farm', 'west end',
+    'northbridge', 'subiaco', 'fremantle', 'cottesloe', 'leederville',
+    'north adelaide', 'unley', 'glenelg', 'norwood', 'prospect'
+)
+# 合并为单个正则，长名称优先，使 'south brisbane' 不会只匹配到 'brisbane'；
+# 边界只排除英文字母 (\b 会把中文视为单词字符，"在Sydney租房" 将无法匹配)
+_LOCATION_RE = re.compile(
+    r'(?<![A-Za-z])(' + '|'.join(
+        re.escape(loc) for loc in sorted(_AUSTRALIAN_LOCATIONS, key=len, reverse=True)
+    ) + r')(?![A-Za-z])',
+    re.IGNORECASE
+)
+
+# 回退解析使用的预编译正则
+_PRICE_PATTERNS = (
+    re.compile(r'\$(\d+)(?:\s*(?:per\s+week|pw|/week|weekly))?', re.IGNORECASE),
+    re.compile(r'(\d+)(?:\s*(?:per\s+week|pw|/week|weekly))', re.IGNORECASE),
+    re.compile(r'\$(\d+)(?:\s*(?:per\s+month|pm|/month|monthly))?', re.IGNORECASE),
+)
+_PRICE_RANGE_RE = re.compile(r'\$?(\d+)[-–]\$?(\d+)')
+# 整词匹配，避免 "2 balcony" 被识别为2个卫浴、"2 brown" 被识别为2个卧室；
+# 边界只排除英文字母，使 "2 bedroom的公寓"、"2bed1bath" 仍能识别
+_BED_PATTERNS = (
+    re.compile(r'(\d+)\s*(?:bedrooms?|beds?|br)(?![A-Za-z])', re.IGNORECASE),
+    re.compile(r'(?<![A-Za-z])(?:bedrooms?|beds?|br)\s*(\d+)', re.IGNORECASE),
+)
+_BATH_PATTERNS = (
+    re.compile(r'(\d+)\s*(?:bathrooms?|baths?|ba)(?![A-Za-z])', re.IGNORECASE),
+    re.compile(r'(?<![A-Za-z])(?:bathrooms?|baths?|ba)\s*(\d+)', re.IGNORECASE),
+)
+# 停车位写法较多 ("1 carspace"、"2 car spaces"、"1 car park"、"carport")，长的写法放在前面
+_PARK_WORDS = r'(?:car\s*(?:spaces?|parks?)|carports?|cars?|parking(?:\s+spaces?)?|garages?)'
+_PARK_PATTERNS = (
+    re.compile(r'(\d+)\s*' + _PARK_WORDS + r'(?![A-Za-z])', re.IGNORECASE),
+    re.compile(r'(?<![A-Za-z])' + _PARK_WORDS + r'\s*(\d+)', re.IGNORECASE),
+)
+_COUNT_FIELD_PATTERNS = (
+    ("bedrooms", _BED_PATTERNS),
+    ("bathrooms", _BATH_PATTERNS),
+    ("parking_spaces", _PARK_PATTERNS),
+)
+
+# 关键词检测 (与原子串匹配语义一致，每项单次扫描)
+_MONTHLY_UNIT_RE = re.compile(r'per month|pm|/month|monthly', re.IGNORECASE)
+_RENT_RE = re.compile(r'rent|lease|looking for', re.IGNORECASE)
+_SALE_RE = re.compile(r'sale|buy|purchase', re.IGNORECASE)
+_PARKING_RE = re.compile(r'parking|garage|car space', re.IGNORECASE)
+_PET_RE = re.compile(r'pet|dog|cat', re.IGNORECASE)
+
+# 信息抽取的固定规则放在system消息中，每次请求的前缀完全相同，可命中OpenAI的提示词前缀缓存
+_SYSTEM_PROMPT = """You are a precise data extraction assistant. Always return valid JSON.
+You are an information extractor. Return ONLY one valid JSON object.
+Keys: listing_type("rent"|"sale"|null), property_type("apartment"|"house"|"townhouse"|"studio"|null),
+title(string|null), address(string|null), price(string|null),
+bedrooms(int|null), bathrooms(int|null), parking_spaces(int|null), url(string|null),
+suburbs(string[]), price_min(int|null), price_max(int|null), unit("per_week"|"per_month"|null).
+
+Rules: 
+- AUD integers for prices
+- Accept typos & mixed languages
+- 'pw|per week|weekly' -> per_week
+- 'pm|pcm|per month|monthly' -> per_month
+- Extract information from the provided text
+- If information is not available, use null
+- For suburbs, provide an array of location names mentioned"""
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# user消息只包含变化的输入文本；模板按 {text} 预先切分，调用时直接拼接
+_PROMPT_TEMPLATE = """Text: {text}
+
+Return only the JSON object:"""
+_PROMPT_PREFIX, _PROMPT_SUFFIX = _PROMPT_TEMPLATE.split("{text}")
+
+# 估算token数时每个token对应的平均字符数
+_CHARS_PER_TOKEN = 4
+
+# 用于从模型输出中截取JSON对象
+_JSON_DECODER = json.JSONDecoder()
+
+# OpenAI解析结果缓存的最大条目数
+_RESPONSE_CACHE_MAX_ENTRIES = 512
+
+# 解析结果缺失时使用的默认房产字段 (模型校验时会复制为新的list/dict，可安全共享)
+_DEFAULT_FEATURES = ("Air Conditioning", "Built-in Wardrobes", "Balcony")
+_DEFAULT_IMAGES = ("https://example.com/property1.jpg",)
+_DEFAULT_AGENT = {
+    "name": "Property Agent",
+    "phone": "0400 000 000",
+    "email": "agent@realestate.com"
+}
+_DEFAULT_COORDINATES = {"lat": -33.8688, "lng": 151.2093}
+
+
+@lru_cache(maxsize=256)
+def _rule_based_parse(text: str) -> Dict[str, Any]:
+    """规则解析 (纯函数，按输入文本缓存结果)"""
+    result = {}
+    
+    try:
+        # 价格提取
+        for pattern in _PRICE_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                price = int(match.group(1))
+                result["price"] = f"${price}"
+                
+                # 判断单位
+                if _MONTHLY_UNIT_RE.search(text):
+                    result["unit"] = "per_month"
+                    result["price_min"] = result["price_max"] = price
+                else:
+                    result["unit"] = "per_week"
+                    result["price_min"] = result["price_max"] = price
+                break
+        
+        # 价格范围提取
+        range_match = _PRICE_RANGE_RE.search(text)
+        if range_match:
+            result["price_min"] = int(range_match.group(1))
+            result["price_max"] = int(range_match.group(2))
+        
+        # 卧室/卫浴/停车位数量 (按表匹配，每个字段取第一个命中的模式)
+        for field, patterns in _COUNT_FIELD_PATTERNS:
+            for pattern in patterns:
+                match = pattern.search(text)
+                if match:
+                    result[field] = int(match.group(1))
+                    break
+        
+        # 房产类型 (单次正则扫描，按优先级选取)
+        found_types = {
+            _PROPERTY_TYPE_KEYWORDS[m.lower()] for m in _PROPERTY_TYPE_RE.findall(text)
+        }
+        for property_type in _PROPERTY_TYPE_PRIORITY:
+            if property_type in found_types:
+                result["property_type"] = property_type
+                break
+        
+        # 租售类型
+        if _RENT_RE.search(text):
+            result["listing_type"] = "rent"
+        elif _SALE_RE.search(text):
+            result["listing_type"] = "sale"
+        else:
+            result["listing_type"] = "rent"  # 默认租房
+        
+        # 地址/区域提取 (按文中出现顺序，同一区域只保留一次)
+        # finditer 惰性扫描，凑满3个区域即停止，不再扫描剩余文本
+        found_locations = []
+        for match in _LOCATION_RE.finditer(text):
+            location = match.group(1).title()
+            if location not in found_locations:
+                found_locations.append(location)
+                if len(found_locations) == 3:  # 最多3个
+                    break
+        
+        if found_locations:
+            result["suburbs"] = found_locations
+            result["address"] = found_locations[0]
+        
+        # 特殊需求检测
+        if _PARKING_RE.search(text):
+            result["parking_spaces"] = result.get("parking_spaces", 1)
+        
+        if _PET_RE.search(text):
+            result["pet_friendly"] = True
+        
+        logger.debug("Fallback parsing result: %s", result)
+        return result
+        
+    except Exception as e:
+        logger.error("Fallback parsing failed: %s", e)
+        return {}
+
+
+def _copy_parsed(result: Dict[str, Any]) -> Dict[str, Any]:
+    """复制缓存的解析结果 (suburbs列表也复制)，避免调用方修改缓存内容"""
+    result = dict(result)
+    if isinstance(result.get("suburbs"), list):
+        result["suburbs"] = list(result["suburbs"])
+    return result
+
 
 class OpenAIPropertyParser:
     """OpenAI房产数据解析器"""
@@ -37,31 +243,37 @@ class OpenAIPropertyParser:
         self.model = model or settings.OPENAI_MODEL
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self.temperature = settings.OPENAI_TEMPERATURE
+        # 输入文本的字符上限，由token预算换算而来
+        self.max_input_chars = settings.OPENAI_INPUT_TOKEN_BUDGET * _CHARS_PER_TOKEN
+        # 限制同时进行的OpenAI请求数，超出的调用排队等待
+        self._request_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENT_REQUESTS)
+        # OpenAI解析结果缓存: key -> (过期时间, 结果)
+        self._response_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # 通过extra_body传递service_tier，兼容不支持该参数的旧版SDK
+        self.extra_body = (
+            {"service_tier": settings.OPENAI_SERVICE_TIER} if settings.OPENAI_SERVICE_TIER else None
+        )
         
         if not self.api_key:
             logger.warning("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
-            self.client = None
-        else:
-            self.client = AsyncOpenAI(api_key=self.api_key)
+        # 客户端按需创建，aclose() 之后的下一次调用会重新创建
+        self.client: Optional[AsyncOpenAI] = None
             
-        self.prompt_template = """You are an information extractor. Return ONLY one valid JSON object.
-Keys: listing_type("rent"|"sale"|null), property_type("apartment"|"house"|"townhouse"|"studio"|null),
-title(string|null), address(string|null), price(string|null),
-bedrooms(int|null), bathrooms(int|null), parking_spaces(int|null), url(string|null),
-suburbs(string[]), price_min(int|null), price_max(int|null), unit("per_week"|"per_month"|null).
+        self.prompt_template = _PROMPT_TEMPLATE
 
-Rules: 
-- AUD integers for prices
-- Accept typos & mixed languages
-- 'pw|per week|weekly' -> per_week
-- 'pm|pcm|per month|monthly' -> per_month
-- Extract information from the provided text
-- If information is not available, use null
-- For suburbs, provide an array of location names mentioned
-
-Text: {text}
+    def get_client(self) -> Optional[AsyncOpenAI]:
+        """获取共享的OpenAI客户端 (未配置API密钥时返回None)"""
+        if not self.api_key:
+            return None
+        if self.client is None:
+            self.client = AsyncOpenAI(api_key=self.api_key)
+        return self.client
 
-Return only the JSON object:"""
+    async def aclose(self):
+        """关闭OpenAI客户端底层的HTTP连接池"""
+        client, self.client = self.client, None
+        if client is not None:
+            await client.close()
 
     async def llm_parse(self, text: str) -> Dict[str, Any]:
         """使用OpenAI API解析文本数据
@@ -75,189 +287,107 @@ Return only the JSON object:"""
         Raises:
             ValueError: API调用失败时抛出
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return {}
             
-        # 如果OpenAI客户端未初始化，使用回退解析
-        if not self.client:
+        # 如果OpenAI客户端不可用，使用回退解析
+        client = self.get_client()
+        if client is None:
             logger.warning("OpenAI client not available, using fallback parsing")
             return self._fallback_parse(text)
         
         try:
-            # 限制输入文本长度，避免token超限
-            text = text[:4000] if len(text) > 4000 else text
-            
-            prompt = self.prompt_template.format(text=text)
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a precise data extraction assistant. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                response_format={"type": "json_object"}  # 确保返回JSON格式
-            )
+            # 按token预算限制输入文本长度
+            if len(text) > self.max_input_chars:
+                text = text[:self.max_input_chars]
+            
+            # 相同模型+输入文本的解析结果在TTL内直接复用，跳过API往返
+            cache_key = self._cache_key(text)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("OpenAI parse cache hit: %s", cache_key)
+                return _copy_parsed(cached)
+            
+            prompt = _PROMPT_PREFIX + text + _PROMPT_SUFFIX
+            
+            async with self._request_semaphore:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        _SYSTEM_MESSAGE,
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    response_format={"type": "json_object"},  # 确保返回JSON格式
+                    extra_body=self.extra_body
+                )
             
             result_text = response.choices[0].message.content.strip()
-            logger.debug(f"OpenAI response: {result_text}")
+            logger.debug("OpenAI response: %s", result_text)
             
             # 解析JSON
             try:
                 result = json.loads(result_text)
-                logger.debug(f"Parsed result: {result}")
-                return result
+                logger.debug("Parsed result: %s", result)
             except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {result_text}, error: {e}")
+                logger.error("Failed to parse JSON response: %s, error: %s", result_text, e)
                 # 尝试提取JSON块
                 json_match = self._extract_json_from_text(result_text)
-                if json_match:
-                    return json.loads(json_match)
-                raise
+                if not json_match:
+                    raise
+                result = json.loads(json_match)
+            
+            self._cache_put(cache_key, result)
+            return _copy_parsed(result)
             
         except Exception as e:
-            logger.error(f"OpenAI API parsing failed: {e}")
+            logger.error("OpenAI API parsing failed: %s", e)
             # 回退到规则解析
             logger.info("Falling back to rule-based parsing")
             return self._fallback_parse(text)
 
+    def _cache_key(self, text: str) -> str:
+        """解析缓存键：模型名与输入文本的哈希"""
+        return hashlib.blake2b(
+            f"{self.model}\0{text}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的缓存结果"""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._response_cache[key]
+            return None
+        return result
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        """写入缓存，超出容量时淘汰最早写入的条目"""
+        self._response_cache.pop(key, None)
+        self._response_cache[key] = (time.monotonic() + settings.CACHE_TTL_SECONDS, result)
+        if len(self._response_cache) > _RESPONSE_CACHE_MAX_ENTRIES:
+            del self._response_cache[next(iter(self._response_cache))]
+
     def _extract_json_from_text(self, text: str) -> Optional[str]:
         """从文本中提取JSON块"""
-        # 尝试找到JSON对象
+        # 从每个 '{' 处尝试用C实现的解码器直接解析，返回第一个完整的JSON对象
         start = text.find('{')
-        if start == -1:
-            return None
-        
-        depth = 0
-        for i, char in enumerate(text[start:], start):
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-                if depth == 0:
-                    return text[start:i+1]
+        while start != -1:
+            try:
+                _, end = _JSON_DECODER.raw_decode(text, start)
+                return text[start:end]
+            except json.JSONDecodeError:
+                start = text.find('{', start + 1)
         
         return None
 
     def _fallback_parse(self, text: str) -> Dict[str, Any]:
         """回退的规则解析方法"""
-        result = {}
-        text_lower = text.lower()
-        
-        try:
-            # 价格提取
-            price_patterns = [
-                r'\$(\d+)(?:\s*(?:per\s+week|pw|/week|weekly))?',
-                r'(\d+)(?:\s*(?:per\s+week|pw|/week|weekly))',
-                r'\$(\d+)(?:\s*(?:per\s+month|pm|/month|monthly))?',
-            ]
-            
-            for pattern in price_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    price = int(match.group(1))
-                    result["price"] = f"${price}"
-                    
-                    # 判断单位
-                    if any(unit in text_lower for unit in ['per month', 'pm', '/month', 'monthly']):
-                        result["unit"] = "per_month"
-                        result["price_min"] = result["price_max"] = price
-                    else:
-                        result["unit"] = "per_week"
-                        result["price_min"] = result["price_max"] = price
-                    break
-            
-            # 价格范围提取
-            range_match = re.search(r'\$?(\d+)[-–]\$?(\d+)', text)
-            if range_match:
-                result["price_min"] = int(range_match.group(1))
-                result["price_max"] = int(range_match.group(2))
-            
-            # 卧室数量
-            bed_patterns = [
-                r'(\d+)(?:\s*(?:bed|bedroom|br))',
-                r'(?:bed|bedroom|br)(?:\s*)(\d+)',
-            ]
-            for pattern in bed_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    result["bedrooms"] = int(match.group(1))
-                    break
-            
-            # 卫浴数量
-            bath_patterns = [
-                r'(\d+)(?:\s*(?:bath|bathroom|ba))',
-                r'(?:bath|bathroom|ba)(?:\s*)(\d+)',
-            ]
-            for pattern in bath_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    result["bathrooms"] = int(match.group(1))
-                    break
-            
-            # 停车位
-            park_patterns = [
-                r'(\d+)(?:\s*(?:car|parking|garage))',
-                r'(?:car|parking|garage)(?:\s*)(\d+)',
-            ]
-            for pattern in park_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    result["parking_spaces"] = int(match.group(1))
-                    break
-            
-            # 房产类型
-            if any(word in text_lower for word in ['apartment', 'unit', 'flat']):
-                result["property_type"] = "apartment"
-            elif any(word in text_lower for word in ['house', 'home']):
-                result["property_type"] = "house"
-            elif 'townhouse' in text_lower:
-                result["property_type"] = "townhouse"
-            elif 'studio' in text_lower:
-                result["property_type"] = "studio"
-            
-            # 租售类型
-            if any(word in text_lower for word in ['rent', 'rental', 'lease', 'looking for']):
-                result["listing_type"] = "rent"
-            elif any(word in text_lower for word in ['sale', 'buy', 'purchase']):
-                result["listing_type"] = "sale"
-            else:
-                result["listing_type"] = "rent"  # 默认租房
-            
-            # 地址/区域提取
-            # 常见澳洲城市和地区
-            australian_locations = [
-                'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide', 'canberra', 'darwin', 'hobart',
-                'camperdown', 'newtown', 'surry hills', 'bondi', 'manly', 'paddington', 'redfern',
-                'carlton', 'fitzroy', 'south yarra', 'st kilda', 'richmond', 'brunswick', 'prahran',
-                'fortitude valley', 'south brisbane', 'new farm', 'west end', 'paddington',
-                'northbridge', 'subiaco', 'fremantle', 'cottesloe', 'leederville',
-                'north adelaide', 'unley', 'glenelg', 'norwood', 'prospect'
-            ]
-            
-            found_locations = []
-            for location in australian_locations:
-                if location in text_lower:
-                    found_locations.append(location.title())
-            
-            if found_locations:
-                result["suburbs"] = found_locations[:3]  # 最多3个
-                result["address"] = found_locations[0]
-            
-            # 特殊需求检测
-            if any(word in text_lower for word in ['parking', 'garage', 'car space', 'must have parking']):
-                result["parking_spaces"] = result.get("parking_spaces", 1)
-            
-            if any(word in text_lower for word in ['pet', 'dog', 'cat', 'pet friendly', 'pets allowed']):
-                result["pet_friendly"] = True
-            
-            logger.debug(f"Fallback parsing result: {result}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Fallback parsing failed: {e}")
-            return {}
+        # 缓存结果被多次复用，返回副本以免调用方修改缓存内容
+        return _copy_parsed(_rule_based_parse(text))
 
     async def parse_properties_from_raw(self, raw_data: Dict[str, Any], 
                                       search_params: Dict[str, Any]) -> List[PropertyModel]:
@@ -278,26 +408,34 @@ Return only the JSON object:"""
             markdown = content.get('markdown', '')
             html = content.get('html', '')
             
-            logger.info(f"Parsing data - markdown: {len(markdown)} chars, html: {len(html)} chars")
+            logger.info("Parsing data - markdown: %d chars, html: %d chars", len(markdown), len(html))
             
             # 使用OpenAI解析内容
             if markdown or html:
-                # 优先使用markdown，如果太长则截取
+                # 优先使用markdown
                 parse_text = markdown if markdown else html
-                if len(parse_text) > 4000:
-                    parse_text = parse_text[:4000] + "..."
                 
-                # 添加搜索上下文
-                context_text = f"Search context: Looking for properties in {search_params.get('location', '')}. "
-                if search_params.get('bedrooms'):
-                    context_text += f"{search_params['bedrooms']} bedrooms. "
-                if search_params.get('min_price') or search_params.get('max_price'):
-                    context_text += f"Budget: ${search_params.get('min_price', '')}-${search_params.get('max_price', '')} per week. "
+                # 添加搜索上下文，各片段收集后一次性拼接
+                parts = [f"Search context: Looking for properties in {search_params.get('location', '')}. "]
+                bedrooms = search_params.get('bedrooms')
+                if bedrooms:
+                    parts.append(f"{bedrooms} bedrooms. ")
+                min_price = search_params.get('min_price')
+                max_price = search_params.get('max_price')
+                if min_price or max_price:
+                    parts.append(f"Budget: ${'' if min_price is None else min_price}-${'' if max_price is None else max_price} per week. ")
+                parts.append("\n\nProperty data:\n")
+                
+                # 上下文之外的剩余预算全部留给房产内容，避免llm_parse再次截掉尾部
+                remaining = max(self.max_input_chars - sum(map(len, parts)), 0)
+                if len(parse_text) > remaining:
+                    parse_text = parse_text[:remaining]
+                parts.append(parse_text)
                 
-                full_text = context_text + "\n\nProperty data:\n" + parse_text
+                full_text = "".join(parts)
                 
                 parsed_data = await self.llm_parse(full_text)
-                logger.info(f"OpenAI parsing result: {parsed_data}")
+                logger.info("OpenAI parsing result: %s", parsed_data)
                 
                 # 基于解析结果创建房产数据
                 if parsed_data:
@@ -309,11 +447,11 @@ Return only the JSON object:"""
             if not properties:
                 properties = self._create_sample_properties(search_params)
             
-            logger.info(f"Successfully parsed {len(properties)} properties")
+            logger.info("Successfully parsed %d properties", len(properties))
             return properties
             
         except Exception as e:
-            logger.error(f"Property parsing failed: {e}")
+            logger.error("Property parsing failed: %s", e)
             # 回退到示例数据
             return self._create_sample_properties(search_params)
 
@@ -321,27 +459,31 @@ Return only the JSON object:"""
                                    search_params: Dict[str, Any]) -> Optional[PropertyModel]:
         """从解析数据创建PropertyModel"""
         try:
+            # 端点模块导入本模块，PropertyModel只能在调用时导入
             from app.api.api_v1.endpoints.properties import PropertyModel
-            import uuid
-            from datetime import datetime
+            
+            # 每个键只读取一次，后续分支使用局部变量
+            parsed_type = parsed_data.get('property_type')
+            suburbs = parsed_data.get('suburbs')
+            search_location = search_params.get('location', 'Sydney')
             
             # 基础信息
             property_id = str(uuid.uuid4())
-            title = parsed_data.get('title') or f"{parsed_data.get('property_type', 'Property')} in {search_params.get('location', 'Sydney')}"
+            title = parsed_data.get('title') or f"{parsed_type or 'Property'} in {search_location}"
             price = parsed_data.get('price') or f"${search_params.get('min_price', 500)}/week"
             
             # 地址优先级：parsed_data.address > parsed_data.suburbs[0] > search_params.location
             location = parsed_data.get('address')
-            if not location and parsed_data.get('suburbs'):
-                location = parsed_data['suburbs'][0] if isinstance(parsed_data['suburbs'], list) else parsed_data['suburbs']
+            if not location and suburbs:
+                location = suburbs[0] if isinstance(suburbs, list) else suburbs
             if not location:
-                location = search_params.get('location', 'Sydney')
+                location = search_location
             
             # 房产特征
             bedrooms = parsed_data.get('bedrooms') or search_params.get('bedrooms', 2)
             bathrooms = parsed_data.get('bathrooms') or search_params.get('bathrooms', 1)
             parking = parsed_data.get('parking_spaces') or search_params.get('parking', 1)
-            property_type = parsed_data.get('property_type') or search_params.get('property_type', 'apartment')
+            property_type = parsed_type or search_params.get('property_type', 'apartment')
             
             # 创建PropertyModel
             property_model = PropertyModel(
@@ -354,14 +496,10 @@ Return only the JSON object:"""
                 parking=parking,
                 property_type=property_type,
                 description=f"Modern {property_type} with excellent amenities in {location}",
-                features=["Air Conditioning", "Built-in Wardrobes", "Balcony"],
-                images=["https://example.com/property1.jpg"],
-                agent={
-                    "name": "Property Agent",
-                    "phone": "0400 000 000",
-                    "email": "agent@realestate.com"
-                },
-                coordinates={"lat": -33.8688, "lng": 151.2093},
+                features=_DEFAULT_FEATURES,
+                images=_DEFAULT_IMAGES,
+                agent=_DEFAULT_AGENT,
+                coordinates=_DEFAULT_COORDINATES,
                 url=parsed_data.get('url') or "https://www.domain.com.au/property/sample",
                 source="Domain.com.au",
                 scraped_at=datetime.utcnow().isoformat() + "Z",
@@ -378,7 +516,7 @@ Return only the JSON object:"""
             return property_model
             
         except Exception as e:
-            logger.error(f"Failed to create property from parsed data: {e}")
+            logger.error("Failed to create property from parsed data: %s", e)
             return None
 
     def _create_sample_properties(self, search_params: Dict[str, Any]) -> List[PropertyModel]:
@@ -386,53 +524,73 @@ Return only the JSON object:"""
         properties = []
         
         try:
+            # 端点模块导入本模块，PropertyModel只能在调用时导入
             from app.api.api_v1.endpoints.properties import PropertyModel
-            import uuid
-            from datetime import datetime
+            
+            # 与序号无关的字段在循环外计算一次
+            base_price = search_params.get('min_price', 500)
+            bedrooms = search_params.get('bedrooms', 2)
+            title_suffix = f"{bedrooms} Bed {search_params.get('property_type', 'Apartment')}"
+            property_type = search_params.get('property_type', 'apartment')
+            location = search_params.get('location', 'Sydney')
+            bathrooms = search_params.get('bathrooms', 1)
+            parking = search_params.get('parking', 1)
+            description = f"Well-appointed modern {property_type} with excellent amenities"
+            scraped_at = datetime.utcnow().isoformat() + "Z"
+            
+            # 共享字段只在模板上校验一次，各示例通过 model_copy 覆盖随序号变化的字段；
+            # deep=True 让每个示例拥有独立的 features/inspection_times 等可变字段
+            template = PropertyModel(
+                id="",
+                title="",
+                price="",
+                location=location,
+                bedrooms=bedrooms,
+                bathrooms=bathrooms,
+                parking=parking,
+                property_type=property_type,
+                description=description,
+                features=["Air Conditioning", "Built-in Wardrobes", "Balcony", "Dishwasher"],
+                images=[],
+                agent={},
+                coordinates=None,
+                url="",
+                source="Domain.com.au",
+                scraped_at=scraped_at,
+                available_from="Available Now",
+                property_size=None,
+                land_size=None,
+                year_built=None,
+                energy_rating=None,
+                pet_friendly=None,
+                furnished=None,
+                inspection_times=[]
+            )
             
             # 生成3-5个示例房产
             for i in range(3, 6):
-                property_id = str(uuid.uuid4())
-                base_price = search_params.get('min_price', 500)
-                varied_price = base_price + (i * 50)
-                
-                property_model = PropertyModel(
-                    id=property_id,
-                    title=f"Sample Property {i} - {search_params.get('bedrooms', 2)} Bed {search_params.get('property_type', 'Apartment')}",
-                    price=f"${varied_price}/week",
-                    location=search_params.get('location', 'Sydney'),
-                    bedrooms=search_params.get('bedrooms', 2),
-                    bathrooms=search_params.get('bathrooms', 1),
-                    parking=search_params.get('parking', 1),
-                    property_type=search_params.get('property_type', 'apartment'),
-                    description=f"Well-appointed modern {search_params.get('property_type', 'apartment')} with excellent amenities",
-                    features=["Air Conditioning", "Built-in Wardrobes", "Balcony", "Dishwasher"],
-                    images=[f"https://example.com/property{i}.jpg"],
-                    agent={
+                properties.append(template.model_copy(deep=True, update={
+                    "id": str(uuid.uuid4()),
+                    "title": f"Sample Property {i} - {title_suffix}",
+                    "price": f"${base_price + (i * 50)}/week",
+                    "images": [f"https://example.com/property{i}.jpg"],
+                    "agent": {
                         "name": f"Agent {i}",
                         "phone": f"040{i} 000 000",
                         "email": f"agent{i}@realestate.com"
                     },
-                    coordinates={"lat": -33.8688 + i*0.001, "lng": 151.2093 + i*0.001},
-                    url=f"https://www.domain.com.au/property/sample-{i}",
-                    source="Domain.com.au",
-                    scraped_at=datetime.utcnow().isoformat() + "Z",
-                    available_from="Available Now",
-                    property_size=f"{65 + i*10} sqm",
-                    land_size=None,
-                    year_built=2015 + i,
-                    energy_rating=None,
-                    pet_friendly=i % 2 == 0,
-                    furnished=i % 3 == 0,
-                    inspection_times=[]
-                )
-                
-                properties.append(property_model)
+                    "coordinates": {"lat": -33.8688 + i*0.001, "lng": 151.2093 + i*0.001},
+                    "url": f"https://www.domain.com.au/property/sample-{i}",
+                    "property_size": f"{65 + i*10} sqm",
+                    "year_built": 2015 + i,
+                    "pet_friendly": i % 2 == 0,
+                    "furnished": i % 3 == 0,
+                }))
             
             return properties
             
         except Exception as e:
-            logger.error(f"Failed to create sample properties: {e}")
+            logger.error("Failed to create sample properties: %s", e)
             return []
 
 
@@ -8,8 +8,12 @@ from __future__ import annotations
 
 import json
 import math
+import re
 import time
 import datetime as dt
+import heapq
+from bisect import bisect_left
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import logging
 
@@ -18,27 +22,44 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 价格数字匹配 (如 "$650/week" -> 650)
+_PRICE_RE = re.compile(r'\$?(\d+)')
+
+# 推荐权重配置
+_WEIGHTS = MappingProxyType({
+    "priceU": 0.34,    # 用户价格偏好
+    "area": 0.22,      # 区域匹配
+    "beds": 0.14,      # 卧室数量
+    "baths": 0.08,     # 卫浴数量
+    "ptype": 0.06,     # 房产类型
+    "priceA": 0.08,    # 区域价格合理性
+    "park": 0.05,      # 停车位
+    "features": 0.02,  # 特色功能
+    "fresh": 0.01      # 数据新鲜度
+})
+
+# 相似房产类型集合
+_SIMILAR_TYPES = frozenset({"apartment", "unit", "flat"})
+
+# 卧室/卫浴超出最低要求的数量 -> 得分
+_EXTRA_ROOM_SCORES = MappingProxyType({0: 1.0, 1: 0.8, 2: 0.6})
+
+# 加分特色功能
+_BONUS_FEATURES = ('air conditioning', 'balcony', 'furnished', 'dishwasher', 'gym', 'pool')
+
+# 数据新鲜度：天数上限(含) -> 得分，超过最后一档取末项
+_FRESHNESS_DAY_LIMITS = (7, 30, 90)
+_FRESHNESS_SCORES = (1.0, 0.85, 0.6, 0.4)
+
 
 class PropertyRecommendationService:
     """房产推荐服务"""
     
     def __init__(self):
         """初始化推荐服务"""
-        # 推荐权重配置
-        self.weights = {
-            "priceU": 0.34,    # 用户价格偏好
-            "area": 0.22,      # 区域匹配
-            "beds": 0.14,      # 卧室数量
-            "baths": 0.08,     # 卫浴数量
-            "ptype": 0.06,     # 房产类型
-            "priceA": 0.08,    # 区域价格合理性
-            "park": 0.05,      # 停车位
-            "features": 0.02,  # 特色功能
-            "fresh": 0.01      # 数据新鲜度
-        }
-        
-        # 相似房产类型集合
-        self.similar_types = {"apartment", "unit", "flat"}
+        # 推荐权重和类型集合为模块级常量，所有实例共享
+        self.weights = _WEIGHTS
+        self.similar_types = _SIMILAR_TYPES
     
     def build_query_from_request(self, search_request: Dict[str, Any], 
                                file_default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -115,7 +136,7 @@ class PropertyRecommendationService:
             'pets_req': pets_required
         }
         
-        logger.debug(f"Normalized query: {query}")
+        logger.debug("Normalized query: %s", query)
         return query
     
     def recommend_properties(self, properties: List[PropertyModel], 
@@ -133,22 +154,25 @@ class PropertyRecommendationService:
         if not properties:
             return []
         
-        # 计算区域价格范围
-        area_prices = [self._extract_price_per_week(prop.price) for prop in properties]
-        area_prices = [p for p in area_prices if p is not None]
+        # 每个房产的周租金只解析一次，区域价格范围和打分共用
+        prices = [self._extract_price_per_week(prop.price) for prop in properties]
+        area_prices = [p for p in prices if p is not None]
         
         area_min = min(area_prices) if area_prices else None
         area_max = max(area_prices) if area_prices else None
         
         recommendations = []
         
-        for prop in properties:
+        # 查询区域在整个候选集上不变，只规范化一次
+        query_location = (query.get('suburb') or '').strip().lower()
+        
+        for prop, price_pw in zip(properties, prices):
             # 硬性筛选条件
-            if not self._passes_hard_filters(prop, query):
+            if not self._passes_hard_filters(prop, query, query_location):
                 continue
             
             # 计算推荐得分
-            score_info = self._calculate_score(prop, query, area_min, area_max)
+            score_info = self._calculate_score(prop, query, area_min, area_max, price_pw)
             
             if score_info:
                 recommendations.append(score_info)
@@ -159,17 +183,14 @@ class PropertyRecommendationService:
             price_value = x.get('price_pw') or float('inf')
             return (-x['score'], price_delta, price_value)
         
-        recommendations.sort(key=sort_key)
-        
-        return recommendations[:topk]
+        # 只需要前topk个，部分选择结果与完整排序后切片一致 (相同键保持原顺序)
+        return heapq.nsmallest(topk, recommendations, key=sort_key)
     
-    def _passes_hard_filters(self, prop: PropertyModel, query: Dict[str, Any]) -> bool:
+    def _passes_hard_filters(self, prop: PropertyModel, query: Dict[str, Any],
+                             query_location: str) -> bool:
         """检查是否通过硬性筛选条件"""
-        # 区域筛选
-        prop_location = (prop.location or '').strip().lower()
-        query_location = query.get('suburb', '').strip().lower()
-        
-        if query_location and query_location not in prop_location:
+        # 区域筛选 (query_location 已由调用方规范化为小写)
+        if query_location and query_location not in (prop.location or '').lower():
             return False
         
         # 租售类型筛选
@@ -195,11 +216,11 @@ class PropertyRecommendationService:
         return True
     
     def _calculate_score(self, prop: PropertyModel, query: Dict[str, Any], 
-                        area_min: Optional[float], area_max: Optional[float]) -> Optional[Dict[str, Any]]:
+                        area_min: Optional[float], area_max: Optional[float],
+                        price_pw: Optional[float]) -> Optional[Dict[str, Any]]:
         """计算房产推荐得分"""
         try:
             # 提取基本信息
-            price_pw = self._extract_price_per_week(prop.price)
             prop_type = (prop.property_type or '').lower()
             
             # 计算各项子得分
@@ -213,17 +234,29 @@ class PropertyRecommendationService:
             score_features = self._score_features(prop.features)
             score_fresh = self._score_freshness(prop.scraped_at)
             
+            # 加权子得分只计算一次，总分和明细共用；权重表绑定到局部变量避免重复属性查找
+            w = self.weights
+            weighted_price_user = w["priceU"] * score_price_user
+            weighted_area = w["area"] * score_area
+            weighted_beds = w["beds"] * score_beds
+            weighted_baths = w["baths"] * score_baths
+            weighted_ptype = w["ptype"] * score_ptype
+            weighted_price_area = w["priceA"] * score_price_area
+            weighted_parking = w["park"] * score_parking
+            weighted_features = w["features"] * score_features
+            weighted_fresh = w["fresh"] * score_fresh
+            
             # 计算总得分
             total_score = 100 * (
-                self.weights["priceU"] * score_price_user +
-                self.weights["area"] * score_area +
-                self.weights["beds"] * score_beds +
-                self.weights["baths"] * score_baths +
-                self.weights["ptype"] * score_ptype +
-                self.weights["priceA"] * score_price_area +
-                self.weights["park"] * score_parking +
-                self.weights["features"] * score_features +
-                self.weights["fresh"] * score_fresh
+                weighted_price_user +
+                weighted_area +
+                weighted_beds +
+                weighted_baths +
+                weighted_ptype +
+                weighted_price_area +
+                weighted_parking +
+                weighted_features +
+                weighted_fresh
             )
             
             return {
@@ -241,20 +274,20 @@ class PropertyRecommendationService:
                 "features": prop.features,
                 "images": prop.images,
                 "subscores": {
-                    "price_user": round(100 * self.weights["priceU"] * score_price_user, 2),
-                    "area": round(100 * self.weights["area"] * score_area, 2),
-                    "beds": round(100 * self.weights["beds"] * score_beds, 2),
-                    "baths": round(100 * self.weights["baths"] * score_baths, 2),
-                    "ptype": round(100 * self.weights["ptype"] * score_ptype, 2),
-                    "price_area": round(100 * self.weights["priceA"] * score_price_area, 2),
-                    "parking": round(100 * self.weights["park"] * score_parking, 2),
-                    "features": round(100 * self.weights["features"] * score_features, 2),
-                    "fresh": round(100 * self.weights["fresh"] * score_fresh, 2),
+                    "price_user": round(100 * weighted_price_user, 2),
+                    "area": round(100 * weighted_area, 2),
+                    "beds": round(100 * weighted_beds, 2),
+                    "baths": round(100 * weighted_baths, 2),
+                    "ptype": round(100 * weighted_ptype, 2),
+                    "price_area": round(100 * weighted_price_area, 2),
+                    "parking": round(100 * weighted_parking, 2),
+                    "features": round(100 * weighted_features, 2),
+                    "fresh": round(100 * weighted_fresh, 2),
                 }
             }
             
         except Exception as e:
-            logger.error(f"Error calculating score for property {prop.id}: {e}")
+            logger.error("Error calculating score for property %s: %s", prop.id, e)
             return None
     
     # 得分计算辅助方法
@@ -273,7 +306,7 @@ class PropertyRecommendationService:
         if bedrooms is None or bedrooms < beds_min:
             return 0.0
         diff = bedrooms - beds_min
-        return {0: 1.0, 1: 0.8, 2: 0.6}.get(diff, 0.5)
+        return _EXTRA_ROOM_SCORES.get(diff, 0.5)
     
     def _score_bathrooms(self, bathrooms: Optional[int], baths_min: Optional[int]) -> float:
         """卫浴数量得分"""
@@ -282,7 +315,7 @@ class PropertyRecommendationService:
         if bathrooms is None or bathrooms < baths_min:
             return 0.0
         diff = bathrooms - baths_min
-        return {0: 1.0, 1: 0.8, 2: 0.6}.get(diff, 0.5)
+        return _EXTRA_ROOM_SCORES.get(diff, 0.5)
     
     def _score_property_type(self, prop_type: str, want_type: Optional[str]) -> float:
         """房产类型得分"""
@@ -290,7 +323,8 @@ class PropertyRecommendationService:
             return 0.7
         if prop_type == want_type:
             return 1.0
-        if {prop_type, want_type} <= self.similar_types:
+        # 两次成员检查，无需每次构建临时集合
+        if prop_type in self.similar_types and want_type in self.similar_types:
             return 0.7
         return 0.2
     
@@ -319,11 +353,10 @@ class PropertyRecommendationService:
         if not features:
             return 0.0
         
-        bonus_features = ['air conditioning', 'balcony', 'furnished', 'dishwasher', 'gym', 'pool']
         feature_text = ' '.join(features).lower()
         
         score = 0.0
-        for feature in bonus_features:
+        for feature in _BONUS_FEATURES:
             if feature in feature_text:
                 score += 0.2
         
@@ -339,14 +372,7 @@ class PropertyRecommendationService:
             now = dt.datetime.now(dt.timezone.utc)
             days = (now - scraped_time).days
             
-            if days <= 7:
-                return 1.0
-            elif days <= 30:
-                return 0.85
-            elif days <= 90:
-                return 0.6
-            else:
-                return 0.4
+            return _FRESHNESS_SCORES[bisect_left(_FRESHNESS_DAY_LIMITS, days)]
         except:
             return 0.7
     
@@ -356,9 +382,8 @@ class PropertyRecommendationService:
         if not price_str:
             return None
         
-        import re
         # 匹配价格数字
-        match = re.search(r'\$?(\d+)', price_str)
+        match = _PRICE_RE.search(price_str)
         if match:
             amount = float(match.group(1))
             # 简单假设都是周租金
@@ -8,7 +8,7 @@ import asyncio
 import httpx
 import json
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 
@@ -16,38 +16,46 @@ class APITester:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.test_results = []
+        # 所有测试共用一个客户端，耗时统计不再包含每次新建连接的开销
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享的HTTP客户端"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30)
+        return self._client
 
     async def test_endpoint(self, name: str, method: str, url: str, **kwargs) -> Dict[str, Any]:
         """测试单个API端点"""
-        start_time = time.time()
+        client = self._get_client()
+        start_time = time.perf_counter()
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.request(method, f"{self.base_url}{url}", **kwargs)
-
-                duration = time.time() - start_time
-                success = response.status_code < 400
-
-                result = {
-                    "name": name,
-                    "method": method,
-                    "url": url,
-                    "status_code": response.status_code,
-                    "success": success,
-                    "duration": round(duration * 1000, 2),  # 转换为毫秒
-                    "response_size": len(response.content),
-                }
+            response = await client.request(method, f"{self.base_url}{url}", **kwargs)
 
-                # 尝试解析JSON响应
-                try:
-                    result["response"] = response.json()
-                except:
-                    result["response"] = response.text[:200] + "..." if len(response.text) > 200 else response.text
+            duration = time.perf_counter() - start_time
+            success = response.status_code < 400
 
-                return result
+            result = {
+                "name": name,
+                "method": method,
+                "url": url,
+                "status_code": response.status_code,
+                "success": success,
+                "duration": round(duration * 1000, 2),  # 转换为毫秒
+                "response_size": len(response.content),
+            }
+
+            # 尝试解析JSON响应
+            try:
+                result["response"] = response.json()
+            except:
+                result["response"] = response.text[:200] + "..." if len(response.text) > 200 else response.text
+
+            return result
 
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             return {
                 "name": name,
                 "method": method,
@@ -121,6 +129,15 @@ class APITester:
 
     async def run_all_tests(self):
         """运行所有API测试"""
+        try:
+            await self._run_all_tests()
+        finally:
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+    async def _run_all_tests(self):
+        """依次执行测试用例并打印结果"""
         self.print_header()
 
         # 测试用例列表
@@ -0,0 +1,87 @@
+"""
+OpenAI解析器回退规则的回归测试
+"""
+
+import pytest
+
+from app.services.openai_parser import OpenAIPropertyParser, _rule_based_parse
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3 bed 2 bath 1 carspace", 1),
+    ("2 car spaces", 2),
+    ("1 car space", 1),
+    ("1 car park", 1),
+    ("1 carport", 1),
+    ("2 cars", 2),
+    ("1 parking space", 1),
+    ("parking 2", 2),
+    ("2 garages", 2),
+    ("1 car space的公寓", 1),
+    ("2br1ba1car", 1),
+])
+def test_parking_spaces_variants(text, expected):
+    """常见的停车位写法都应被识别"""
+    assert _rule_based_parse(text)["parking_spaces"] == expected
+
+
+@pytest.mark.parametrize("text", [
+    "2 carrots",
+    "2 balcony",
+])
+def test_parking_spaces_whole_word(text):
+    """非停车位单词不应被误识别"""
+    assert "parking_spaces" not in _rule_based_parse(text)
+
+
+def test_bed_bath_whole_word():
+    """整词匹配：卧室/卫浴数量不受相邻单词影响"""
+    result = _rule_based_parse("2 bedrooms 1 bathroom")
+    assert result["bedrooms"] == 2
+    assert result["bathrooms"] == 1
+    assert "bathrooms" not in _rule_based_parse("2 balcony")
+
+
+@pytest.mark.parametrize("text, bedrooms, bathrooms", [
+    ("2 bedrooms在Newtown", 2, None),
+    ("2 bedroom的公寓", 2, None),
+    ("2bed1bath", 2, 1),
+])
+def test_bed_bath_next_to_cjk_or_digit(text, bedrooms, bathrooms):
+    """单位词后紧跟中文或数字时仍应识别数量"""
+    result = _rule_based_parse(text)
+    assert result.get("bedrooms") == bedrooms
+    assert result.get("bathrooms") == bathrooms
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("在Sydney租房", "sydney"),
+    ("我想在Camperdown找2 bedroom的公寓", "camperdown"),
+    ("Surry Hills附近", "surry hills"),
+    ("looking in Newtown", "newtown"),
+])
+def test_location_next_to_cjk(text, expected):
+    """紧邻中文的区域名也应被识别"""
+    assert expected in [s.lower() for s in _rule_based_parse(text)["suburbs"]]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("找apartment公寓", "apartment"),
+    ("apartment在Newtown", "apartment"),
+    ("想租townhouse", "townhouse"),
+    ("2 bedroom houses", "house"),
+])
+def test_property_type_next_to_cjk(text, expected):
+    """紧邻中文的房产类型也应被识别，且 townhouse 不应被识别为 house"""
+    assert _rule_based_parse(text)["property_type"] == expected
+
+
+async def test_client_recreated_after_aclose():
+    """aclose() 之后再次使用时应重新创建客户端，而不是复用已关闭的客户端"""
+    parser = OpenAIPropertyParser(api_key="test-key")
+    first = parser.get_client()
+    await parser.aclose()
+    assert parser.client is None
+    second = parser.get_client()
+    assert second is not None and second is not first
+    await parser.aclose()